@@ -7,8 +7,36 @@ class GestionImpactsConfig(PluginConfig):
     description = 'Gestion des impacts'
     version = '0.1'
     base_url = 'gestion_impacts'
+    graphql_schema = 'graphql.schema.schema'
     required_settings = []
-    default_settings = {}
+    default_settings = {
+        # Paginate the impact list and API on (vrf, address, pk) instead of page numbers
+        'keyset_pagination': False,
+        # Bulk edits of more IP addresses than this run as a background job, committed in chunks
+        'bulk_edit_job_threshold': 1000,
+        'bulk_edit_job_chunk_size': 500,
+        # Rows merged per transaction by the CSV import and the API upsert endpoint
+        'import_chunk_size': 5000,
+        # Maximum (decompressed) size in bytes of an upsert request body, which is parsed in memory
+        'upsert_max_body_size': 100 * 1024 * 1024,
+        # Rows fetched per round trip by the streaming CSV / JSON Lines export
+        'export_chunk_size': 2000,
+        # Cache lifetimes (seconds, 0 to disable) of the list counts and of the VRF filter choices
+        'count_cache_timeout': 300,
+        'choices_cache_timeout': 3600,
+        # Record Prometheus metrics (django-prometheus registry) for the list, edit, export and API views
+        'metrics_enabled': False,
+        # Store the EXPLAIN plans of impact list requests spending more than this many milliseconds in SQL
+        # (None to disable), keeping the last slow_query_buffer_size requests
+        'slow_query_threshold': None,
+        'slow_query_buffer_size': 50,
+        # Interval (minutes) of the background job refreshing the coverage report (see refresh_impact_coverage)
+        'coverage_refresh_interval': 15,
+    }
+
+    def ready(self):
+        super().ready()
+        from . import signals  # noqa: F401
 
 
 config = GestionImpactsConfig
@@ -0,0 +1,53 @@
+from django.db.models import BigIntegerField, F, Value
+from django.db.models.functions import Coalesce
+from ipam.fields import IPAddressField
+from netbox.api.pagination import OptionalLimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+from gestion_impacts.pagination import KeysetPaginator, estimate_count, keyset_pagination_enabled
+
+
+def get_impact_keys():
+    # (vrf, address, pk) of the Impact's IP address
+    return {
+        'keyset_vrf': Coalesce(F('vrf_id'), Value(0), output_field=BigIntegerField()),
+        'keyset_address': Coalesce(F('ip_address__address'), Value('0.0.0.0/0'), output_field=IPAddressField()),
+        'keyset_pk': F('pk'),
+    }
+
+
+class ImpactPagination(OptionalLimitOffsetPagination):
+    """
+    Keyset (cursor) pagination when the `cursor` query parameter is present or keyset_pagination is enabled,
+    and NetBox's limit/offset pagination otherwise.
+    """
+    cursor_query_param = 'cursor'
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset_page = None
+        if self.offset_query_param in request.query_params or not keyset_pagination_enabled(request.query_params):
+            return super().paginate_queryset(queryset, request, view)
+
+        self.request = request
+        self.limit = self.get_limit(request) or self.default_limit
+        self.count, _ = estimate_count(queryset)
+        paginator = KeysetPaginator(queryset, get_impact_keys(), self.limit)
+        self.keyset_page = paginator.get_page(request.query_params.get(self.cursor_query_param))
+        return self.keyset_page.object_list
+
+    def get_cursor_link(self, cursor):
+        if cursor is None:
+            return None
+        url = remove_query_param(self.request.build_absolute_uri(), self.offset_query_param)
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        if self.keyset_page is None:
+            return super().get_paginated_response(data)
+        return Response({
+            'count': self.count,
+            'next': self.get_cursor_link(self.keyset_page.next_cursor),
+            'previous': self.get_cursor_link(self.keyset_page.previous_cursor),
+            'results': data,
+        })
@@ -0,0 +1,28 @@
+import gzip
+import io
+
+from netbox.plugins.utils import get_plugin_config
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+
+
+class GzipJSONParser(JSONParser):
+    """
+    JSON parser also accepting request bodies sent with "Content-Encoding: gzip", decompressed while reading. The
+    body is parsed in memory, so its (decompressed) size is capped by the upsert_max_body_size setting.
+    """
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        request = (parser_context or {}).get('request')
+        if stream is not None:
+            if request is not None and request.META.get('HTTP_CONTENT_ENCODING') == 'gzip':
+                stream = gzip.GzipFile(fileobj=stream)
+            max_size = get_plugin_config('gestion_impacts', 'upsert_max_body_size')
+            try:
+                body = stream.read(max_size + 1)
+            except (OSError, EOFError) as e:
+                raise ParseError(f'Invalid gzip request body: {e}')
+            if len(body) > max_size:
+                raise ParseError(f'Request body too large: the limit is {max_size} bytes once decompressed')
+            stream = io.BytesIO(body)
+        return super().parse(stream, media_type, parser_context)
@@ -1,9 +1,19 @@
 from netbox.api.serializers import NetBoxModelSerializer
+from rest_framework import serializers
 
 from gestion_impacts.models import Impact
 
 
 class ImpactSerializer(NetBoxModelSerializer):
+    url = serializers.HyperlinkedIdentityField(view_name='plugins-api:gestion_impacts-api:impact-detail')
+    # Flat representation of the IP address, e.g. for ?brief=1 or ?fields=address,vrf_name,impact
+    address = serializers.CharField(source='ip_address.address', read_only=True, default=None)
+    vrf_name = serializers.CharField(source='vrf.name', read_only=True, default=None)
+
     class Meta:
         model = Impact
-        fields = ('id', 'impact', 'redundancy', 'ip_address', 'vrf')
+        fields = (
+            'id', 'url', 'display', 'impact', 'redundancy', 'ip_address', 'address', 'vrf', 'vrf_name', 'tags',
+            'custom_fields', 'created', 'last_updated',
+        )
+        brief_fields = ('id', 'url', 'display', 'impact', 'redundancy', 'ip_address', 'address', 'vrf', 'vrf_name')
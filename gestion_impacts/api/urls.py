@@ -1,10 +1,16 @@
+from django.urls import path
 from netbox.api.routers import NetBoxRouter
 
-from .views import ImpactViewSet
+from .views import BlastRadiusView, CoverageView, ImpactViewSet, PrefixSummaryView
 
 app_name = 'gestion_impacts'
 
 router = NetBoxRouter()
 router.register('impact', ImpactViewSet)
 
-urlpatterns = router.urls
+urlpatterns = [
+    path('blast-radius/', BlastRadiusView.as_view(), name='blast_radius'),
+    path('coverage/', CoverageView.as_view(), name='coverage'),
+    path('prefix-summary/<int:pk>/', PrefixSummaryView.as_view(), name='prefix_summary'),
+    *router.urls,
+]
@@ -1,9 +1,124 @@
+from django.shortcuts import get_object_or_404
+from ipam.models import IPAddress, Prefix
+from netbox.api.authentication import IsAuthenticatedOrLoginNotRequired
 from netbox.api.viewsets import NetBoxModelViewSet
+from netbox.plugins.utils import get_plugin_config
+from rest_framework.decorators import action
+from rest_framework.exceptions import PermissionDenied, ValidationError
+from rest_framework.response import Response
+from rest_framework.views import APIView
 
+from gestion_impacts.api.pagination import ImpactPagination
+from gestion_impacts.api.parsers import GzipJSONParser
 from gestion_impacts.api.serializers import ImpactSerializer
+from gestion_impacts.blast_radius import SCOPE_LOOKUPS, get_blast_radius
+from gestion_impacts.coverage import get_coverage
+from gestion_impacts.conditional import get_not_modified_response, get_validators, set_validators
+from gestion_impacts.filtersets import ImpactAPIFilterSet
+from gestion_impacts.imports import upsert_impacts
+from gestion_impacts.metrics import InstrumentedViewMixin
 from gestion_impacts.models import Impact
+from gestion_impacts.prefixes import get_child_prefix_summary
 
 
-class ImpactViewSet(NetBoxModelViewSet):
-    queryset = Impact.objects.all()
+class ImpactViewSet(InstrumentedViewMixin, NetBoxModelViewSet):
+    metrics_view = 'api'
+    queryset = Impact.objects.select_related('ip_address', 'vrf').prefetch_related('tags')
     serializer_class = ImpactSerializer
+    filterset_class = ImpactAPIFilterSet
+    pagination_class = ImpactPagination
+
+    def list(self, request, *args, **kwargs):
+        # Conditional GET: unchanged lists are answered with 304 Not Modified, without querying the Impacts
+        validators = get_validators(request)
+        if response := get_not_modified_response(request, *validators):
+            return set_validators(response, *validators)
+        response = super().list(request, *args, **kwargs)
+        if isinstance(response.data, dict) and 'results' in response.data:
+            self.metrics.rows = len(response.data['results'])
+        return set_validators(response, *validators)
+
+    @action(detail=False, methods=['post'], parser_classes=[GzipJSONParser])
+    def upsert(self, request):
+        """
+        Create or update the Impacts of a list of {address, vrf, impact, redundancy} objects, keyed by IP address
+        and VRF name (null for the global table) or vrf_id.
+        """
+        if not request.user.has_perms(['gestion_impacts.add_impact', 'gestion_impacts.change_impact']):
+            raise PermissionDenied()
+        if not isinstance(request.data, list):
+            raise ValidationError('Expected a list of {address, vrf, impact, redundancy} objects')
+
+        result, results = upsert_impacts(
+            request.data,
+            batch_size=get_plugin_config('gestion_impacts', 'import_chunk_size'),
+            user=request.user,
+            request_id=getattr(request, 'id', None),
+            ip_addresses=IPAddress.objects.restrict(request.user, 'view'),
+            impacts=Impact.objects.restrict(request.user, 'change'),
+        )
+        return Response({
+            'count': result.rows,
+            'created': result.created,
+            'updated': result.updated,
+            'errors': result.error_count,
+            'results': results,
+        })
+
+
+class BlastRadiusView(APIView):
+    """
+    Report the impacts of an outage of a set of devices, virtual machines, sites or racks, given as lists of ids
+    (device_id, virtual_machine_id, site_id, rack_id) in the query string or in a JSON body.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get_scope(self, request):
+        scope = {}
+        for name in SCOPE_LOOKUPS:
+            if request.method == 'POST':
+                values = (request.data.get(name) or []) if isinstance(request.data, dict) else []
+                values = values if isinstance(values, list) else [values]
+            else:
+                values = request.query_params.getlist(name)
+            try:
+                scope[name] = [int(value) for value in values]
+            except (TypeError, ValueError):
+                raise ValidationError({name: 'Expected a list of ids'})
+        if not any(scope.values()):
+            raise ValidationError(f'Select at least one of: {", ".join(SCOPE_LOOKUPS)}')
+        return scope
+
+    def get(self, request):
+        if not request.user.has_perm('gestion_impacts.view_impact'):
+            raise PermissionDenied()
+        ip_addresses = IPAddress.objects.restrict(request.user, 'view')
+        return Response(get_blast_radius(self.get_scope(request), ip_addresses))
+
+    def post(self, request):
+        return self.get(request)
+
+
+class PrefixSummaryView(APIView):
+    """
+    Count the IP addresses, impacts and non-redundant impacts of a prefix and of each of its child prefixes.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request, pk):
+        if not request.user.has_perm('gestion_impacts.view_impact'):
+            raise PermissionDenied()
+        prefix = get_object_or_404(Prefix.objects.restrict(request.user, 'view'), pk=pk)
+        return Response(get_child_prefix_summary(prefix))
+
+
+class CoverageView(APIView):
+    """
+    Return the impact coverage report (totals and groups by VRF, site, tenant and device role), as last refreshed.
+    """
+    permission_classes = [IsAuthenticatedOrLoginNotRequired]
+
+    def get(self, request):
+        if not request.user.has_perm('gestion_impacts.view_impact'):
+            raise PermissionDenied()
+        return Response(get_coverage())
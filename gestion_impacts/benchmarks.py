@@ -0,0 +1,350 @@
+import random
+import statistics
+import time
+
+import netaddr
+from dcim.models import Device, DeviceRole, DeviceType, Interface, Manufacturer, Site
+from django.conf import settings
+from django.contrib.contenttypes.models import ContentType
+from django.contrib.contenttypes.fields import GenericRelation
+from django.db import connection, transaction
+from django.db.models import CASCADE, PROTECT, RESTRICT, SET_NULL, Count, ProtectedError, RestrictedError
+from django.template import Context
+from django.test import Client, RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from extras.models import TaggedItem
+from ipam.models import IPAddress, Prefix, VRF
+from virtualization.models import VirtualMachine, VMInterface
+
+from .bulk import bulk_edit_impacts
+from .cache import invalidate_counts
+from .custom import ACTIONS_COLUMN_FIELDS, CustomActionsColumn
+from .inventory import get_inventoried_ip_addresses, rebuild_inventory
+from .models import Impact, ImpactInventory
+from .tables import ImpactTable
+from .views import get_ip_address_queryset
+
+# Every synthetic object is named with this prefix, which is how they are found again for cleanup
+BENCHMARK_PREFIX = 'bench-'
+BATCH_SIZE = 5000
+
+IMPACT_WORDS = (
+    'coupure', 'service', 'web', 'supervision', 'sauvegarde', 'messagerie', 'paie', 'téléphonie', 'production',
+    'recette', 'annuaire', 'dns', 'proxy', 'stockage', 'impression', 'badge', 'vidéo', 'facturation',
+)
+
+
+#
+# Synthetic dataset
+#
+
+def seed_dataset(vrfs=4, devices=200, vms=200, interfaces=4, ip_addresses=10000, impact_ratio=0.5, seed=0,
+                 log=print):
+    """
+    Create a synthetic dataset: VRFs with a covering prefix, devices and VMs with `interfaces` interfaces each, and
+    `ip_addresses` active IP addresses spread over the VRFs and assigned round-robin to the interfaces (one in ten
+    is left unassigned). `impact_ratio` of them get an Impact. Objects are created with bulk queries, the impact
+    inventory is rebuilt at the end.
+    """
+    rng = random.Random(seed)
+
+    with transaction.atomic():
+        site = Site.objects.create(name=f'{BENCHMARK_PREFIX}site', slug=f'{BENCHMARK_PREFIX}site')
+        manufacturer = Manufacturer.objects.create(
+            name=f'{BENCHMARK_PREFIX}manufacturer', slug=f'{BENCHMARK_PREFIX}manufacturer'
+        )
+        device_type = DeviceType.objects.create(
+            manufacturer=manufacturer, model=f'{BENCHMARK_PREFIX}device-type', slug=f'{BENCHMARK_PREFIX}device-type'
+        )
+        role = DeviceRole.objects.create(name=f'{BENCHMARK_PREFIX}role', slug=f'{BENCHMARK_PREFIX}role')
+
+        vrf_objects = VRF.objects.bulk_create([VRF(name=f'{BENCHMARK_PREFIX}vrf-{i}') for i in range(vrfs)])
+        for vrf in vrf_objects:
+            Prefix.objects.create(prefix='10.0.0.0/8', vrf=vrf)
+
+        device_objects = Device.objects.bulk_create([
+            Device(name=f'{BENCHMARK_PREFIX}device-{i}', site=site, device_type=device_type, role=role)
+            for i in range(devices)
+        ], batch_size=BATCH_SIZE)
+        vm_objects = VirtualMachine.objects.bulk_create([
+            VirtualMachine(name=f'{BENCHMARK_PREFIX}vm-{i}', site=site) for i in range(vms)
+        ], batch_size=BATCH_SIZE)
+        interface_objects = Interface.objects.bulk_create([
+            Interface(device=device, name=f'eth{i}', type='1000base-t')
+            for device in device_objects for i in range(interfaces)
+        ], batch_size=BATCH_SIZE)
+        vminterface_objects = VMInterface.objects.bulk_create([
+            VMInterface(virtual_machine=vm, name=f'eth{i}')
+            for vm in vm_objects for i in range(interfaces)
+        ], batch_size=BATCH_SIZE)
+        log(f"Created {vrfs} VRFs, {devices} devices, {vms} VMs, "
+            f"{len(interface_objects) + len(vminterface_objects)} interfaces")
+
+        interface_type = ContentType.objects.get_for_model(Interface)
+        vminterface_type = ContentType.objects.get_for_model(VMInterface)
+        assignments = [
+            *((interface_type, interface.pk) for interface in interface_objects),
+            *((vminterface_type, interface.pk) for interface in vminterface_objects),
+        ]
+
+        base = int(netaddr.IPAddress('10.0.0.1'))
+        for start in range(0, ip_addresses, BATCH_SIZE):
+            batch = []
+            for i in range(start, min(start + BATCH_SIZE, ip_addresses)):
+                assigned_type, assigned_id = (
+                    assignments[i % len(assignments)] if assignments and i % 10 else (None, None)
+                )
+                batch.append(IPAddress(
+                    address=f'{netaddr.IPAddress(base + i // vrfs)}/8',
+                    vrf=vrf_objects[i % vrfs],
+                    status='active',
+                    assigned_object_type=assigned_type,
+                    assigned_object_id=assigned_id,
+                ))
+            created = IPAddress.objects.bulk_create(batch)
+            Impact.objects.bulk_create([
+                Impact(
+                    ip_address=ip_address,
+                    vrf_id=ip_address.vrf_id,
+                    impact=' '.join(rng.sample(IMPACT_WORDS, 3)),
+                    redundancy=rng.random() < 0.5,
+                )
+                for ip_address in created if rng.random() < impact_ratio
+            ])
+            log(f"Created {start + len(batch)} IP addresses")
+
+    rebuild_inventory()
+    log("Rebuilt the impact inventory")
+
+
+def delete_dependents(queryset):
+    """
+    Delete or unlink everything referencing the objects of a queryset, before they are deleted with a raw query
+    which skips the ORM cascades: tags, generic relations (journal entries, bookmarks...), foreign keys (deleted or
+    set to null, per their on_delete) and many-to-many links. A PROTECT or RESTRICT reference raises ProtectedError
+    or RestrictedError, as the ORM would. The change log is an audit trail and is kept.
+    """
+    model = queryset.model
+    object_type = ContentType.objects.get_for_model(model)
+    pks = queryset.values('pk')
+
+    TaggedItem.objects.filter(content_type=object_type, object_id__in=pks).delete()
+    for field in model._meta.private_fields:
+        if isinstance(field, GenericRelation):
+            field.related_model.objects.filter(**{
+                field.content_type_field_name: object_type, f'{field.object_id_field_name}__in': pks,
+            }).delete()
+    for relation in model._meta.related_objects:
+        if relation.many_to_many:
+            relation.through.objects.filter(**{f'{relation.field.m2m_reverse_field_name()}__in': pks}).delete()
+            continue
+        name = relation.field.name
+        related = relation.related_model._base_manager.filter(**{f'{name}__in': pks})
+        if relation.on_delete is CASCADE:
+            related.delete()
+        elif relation.on_delete is SET_NULL:
+            related.update(**{name: None})
+        elif relation.on_delete in (PROTECT, RESTRICT):
+            if related.exists():
+                error = ProtectedError if relation.on_delete is PROTECT else RestrictedError
+                raise error(
+                    f"Cannot delete some {model._meta.verbose_name_plural}: they are referenced through "
+                    f"{relation.related_model.__name__}.{name}",
+                    set(related),
+                )
+        else:
+            raise ValueError(f"Unsupported on_delete for {relation.related_model.__name__}.{name}")
+
+
+def delete_dataset(log=print):
+    """
+    Delete the synthetic dataset. The inventory, Impacts and IP addresses are deleted with raw queries once their
+    dependents are gone (see delete_dependents): deleting a million objects through the ORM would collect them all
+    and send their signals. The other objects, interfaces included, are few enough for the ORM.
+    """
+    vrfs = VRF.objects.filter(name__startswith=BENCHMARK_PREFIX)
+    with transaction.atomic():
+        for queryset in (
+            ImpactInventory.objects.filter(ip_address__vrf__in=vrfs),
+            Impact.objects.filter(ip_address__vrf__in=vrfs),
+            IPAddress.objects.filter(vrf__in=vrfs),
+        ):
+            delete_dependents(queryset)
+            queryset._raw_delete(queryset.db)
+        Prefix.objects.filter(vrf__in=vrfs).delete()
+        Device.objects.filter(name__startswith=BENCHMARK_PREFIX).delete()
+        VirtualMachine.objects.filter(name__startswith=BENCHMARK_PREFIX).delete()
+        vrfs.delete()
+        DeviceType.objects.filter(slug__startswith=BENCHMARK_PREFIX).delete()
+        Manufacturer.objects.filter(slug__startswith=BENCHMARK_PREFIX).delete()
+        DeviceRole.objects.filter(slug__startswith=BENCHMARK_PREFIX).delete()
+        Site.objects.filter(slug__startswith=BENCHMARK_PREFIX).delete()
+    log("Deleted the benchmark dataset")
+
+
+#
+# Scenarios
+#
+
+def measure(name, func, repeat=3):
+    """
+    Run `func` `repeat` times, each time in a transaction rolled back afterwards, and return its timings and the
+    number of queries of the last run. The cached list counts are retired before every run, so that each one pays
+    for its COUNT. The first run, which also warms up the database and Python caches, is reported as `cold_ms`
+    and left out of the median and minimum.
+    """
+    timings = []
+    result = None
+    for _ in range(repeat):
+        invalidate_counts()
+        with transaction.atomic():
+            with CaptureQueriesContext(connection) as queries:
+                start = time.perf_counter()
+                result = func()
+                timings.append((time.perf_counter() - start) * 1000)
+            transaction.set_rollback(True)
+    warm = timings[1:] or timings
+    return {
+        'name': name,
+        'runs_ms': [round(timing, 2) for timing in timings],
+        'cold_ms': round(timings[0], 2),
+        'median_ms': round(statistics.median(warm), 2),
+        'min_ms': round(min(warm), 2),
+        'queries': len(queries),
+        **(result if isinstance(result, dict) else {}),
+    }
+
+
+def get_client(user):
+    host = next((host for host in settings.ALLOWED_HOSTS if host != '*' and not host.startswith('.')), 'localhost')
+    client = Client(HTTP_HOST=host)
+    client.force_login(user)
+    return client
+
+
+def fetch(client, url, **headers):
+    response = client.get(url, **headers)
+    if response.status_code not in (200, 304):
+        raise RuntimeError(f"GET {url} returned {response.status_code}")
+    content = b''.join(response.streaming_content) if response.streaming else response.content
+    return {'status': response.status_code, 'bytes': len(content)}
+
+
+class PerRowActionsColumn(CustomActionsColumn):
+    """
+    CustomActionsColumn resolving its permissions, URL patterns and template again for every row, as it did before
+    they were cached per table: the baseline of the actions column benchmarks.
+    """
+
+    def get_render_state(self, table):
+        table._actions_render_state = None
+        return super().get_render_state(table)
+
+
+class PerRowActionsImpactTable(ImpactTable):
+    actions = PerRowActionsColumn()
+
+
+def render_actions_column(user, rows=1000, table_class=ImpactTable):
+    """
+    Render the actions column of `rows` list rows for `user`, isolating it from the rest of the table.
+    """
+    request = RequestFactory().get(reverse('plugins:gestion_impacts:impact_list'))
+    request.user = user
+    table = table_class(list(get_ip_address_queryset(fields=ACTIONS_COLUMN_FIELDS)[:rows]))
+    table.context = Context({'request': request})
+    for row in table.rows:
+        row.get_cell('actions')
+    return {'rows': len(table.rows)}
+
+
+def get_scenarios(client, user, per_page=50):
+    """
+    Return the (name, callable) benchmark scenarios of the plugin's hot paths.
+    """
+    list_url = reverse('plugins:gestion_impacts:impact_list')
+    api_url = reverse('plugins-api:gestion_impacts-api:impact-list')
+    ip_address_count = get_inventoried_ip_addresses().count()
+    last_page = max(1, -(-ip_address_count // per_page))
+    vrf = VRF.objects.filter(name__startswith=BENCHMARK_PREFIX).first()
+    sample = IPAddress.objects.filter(vrf=vrf).order_by('pk').first()
+    ip_address_ids = list(
+        get_inventoried_ip_addresses().filter(vrf__name__startswith=BENCHMARK_PREFIX).values_list('pk', flat=True)
+    )
+
+    def bulk_edit(count):
+        def run():
+            ids = ip_address_ids[:count]
+            created, updated = bulk_edit_impacts(
+                IPAddress.objects.filter(pk__in=ids), {'impact': 'benchmark', 'redundancy': True}
+            )
+            return {'rows': len(created) + len(updated)}
+        return run
+
+    def bulk_edit_view(count):
+        def run():
+            response = client.post(reverse('plugins:gestion_impacts:impact_bulk_edit'), {
+                'pk': ip_address_ids[:count],
+                '_apply': '1',
+                'impact': 'benchmark',
+                'redundancy': 'true',
+            })
+            return {'status': response.status_code}
+        return run
+
+    return [
+        ('list_first_page', lambda: fetch(client, f'{list_url}?per_page={per_page}')),
+        ('list_middle_page', lambda: fetch(client, f'{list_url}?per_page={per_page}&page={last_page // 2 + 1}')),
+        ('list_last_page', lambda: fetch(client, f'{list_url}?per_page={per_page}&page={last_page}')),
+        ('list_keyset_first_page', lambda: fetch(client, f'{list_url}?per_page={per_page}&cursor=')),
+        ('list_htmx_partial', lambda: fetch(client, f'{list_url}?per_page={per_page}', HTTP_HX_REQUEST='true')),
+        ('quick_search_text', lambda: fetch(client, f'{list_url}?per_page={per_page}&q=supervision')),
+        ('quick_search_address', lambda: fetch(
+            client, f'{list_url}?per_page={per_page}&q={sample.address.ip if sample else "10.0.0.1"}'
+        )),
+        ('quick_search_prefix', lambda: fetch(client, f'{list_url}?per_page={per_page}&q=10.0.1.0/24')),
+        ('vrf_filter', lambda: fetch(client, f'{list_url}?per_page={per_page}&vrf={vrf.pk if vrf else "null"}')),
+        ('export_table', lambda: fetch(client, f'{list_url}?export=table')),
+        ('export_jsonl', lambda: fetch(client, f'{list_url}?export=table&format=jsonl')),
+        ('actions_column_1000_rows', lambda: render_actions_column(user, 1000)),
+        ('actions_column_1000_rows_per_row', lambda: render_actions_column(user, 1000, PerRowActionsImpactTable)),
+        ('bulk_edit_view_100', bulk_edit_view(100)),
+        ('bulk_edit_100', bulk_edit(100)),
+        ('bulk_edit_10000', bulk_edit(10000)),
+        ('api_list', lambda: fetch(client, f'{api_url}?limit=100')),
+        ('api_list_brief', lambda: fetch(client, f'{api_url}?limit=100&brief=1')),
+        ('api_list_keyset', lambda: fetch(client, f'{api_url}?limit=100&cursor=')),
+    ]
+
+
+def run_benchmarks(user, per_page=50, repeat=3, only=None, log=print):
+    client = get_client(user)
+    results = []
+    for name, func in get_scenarios(client, user, per_page=per_page):
+        if only and name not in only:
+            continue
+        try:
+            result = measure(name, func, repeat=repeat)
+        except Exception as e:
+            result = {'name': name, 'error': str(e)}
+        log(
+            f"{name}: {result.get('median_ms', '-')} ms (cold {result.get('cold_ms', '-')} ms), "
+            f"{result.get('queries', '-')} queries"
+        )
+        results.append(result)
+    return results
+
+
+def get_dataset_stats():
+    return {
+        'ip_addresses': IPAddress.objects.count(),
+        'inventoried_ip_addresses': ImpactInventory.objects.count(),
+        'impacts': Impact.objects.count(),
+        'vrfs': VRF.objects.count(),
+        'devices': Device.objects.count(),
+        'virtual_machines': VirtualMachine.objects.count(),
+        'ip_addresses_per_vrf': dict(
+            IPAddress.objects.values_list('vrf__name').annotate(count=Count('pk')).order_by('-count')[:10]
+        ),
+    }
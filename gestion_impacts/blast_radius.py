@@ -0,0 +1,72 @@
+from collections import defaultdict
+
+from django.db.models import F, Q
+from ipam.models import IPAddress
+
+from .models import ImpactInventory
+
+# Selection parameter -> IPAddress lookups of the IPs assigned to the selected objects
+SCOPE_LOOKUPS = {
+    'device_id': ('interface__device__in',),
+    'virtual_machine_id': ('vminterface__virtual_machine__in',),
+    'site_id': ('interface__device__site__in', 'vminterface__virtual_machine__site__in'),
+    'rack_id': ('interface__device__rack__in',),
+}
+
+
+def get_blast_radius_rows(scope, ip_addresses=None):
+    """
+    Return the inventory rows of the IP addresses assigned to the devices, virtual machines, sites and racks in
+    `scope` (a dict mapping the keys of SCOPE_LOOKUPS to lists of pks), non-redundant impacts first. This is a
+    single query, whatever the number of selected objects.
+    """
+    query = Q()
+    for name, lookups in SCOPE_LOOKUPS.items():
+        if pks := scope.get(name):
+            for lookup in lookups:
+                query |= Q(**{lookup: pks})
+    if not query:
+        return []
+
+    if ip_addresses is None:
+        ip_addresses = IPAddress.objects.all()
+    return list(
+        ImpactInventory.objects.filter(ip_address__in=ip_addresses.filter(query).values('pk')).values(
+            'ip_address_id', 'vrf_name', 'assigned_to', 'impact_id', 'impact', 'redundancy',
+            address=F('ip_address__address'),
+        ).order_by(F('redundancy').asc(nulls_last=True), 'assigned_to', 'address')
+    )
+
+
+def summarize(rows, key):
+    counts = defaultdict(lambda: {'ip_addresses': 0, 'impacts': 0, 'non_redundant': 0})
+    for row in rows:
+        group = counts[row[key]]
+        group['ip_addresses'] += 1
+        if row['impact_id'] is not None:
+            group['impacts'] += 1
+            group['non_redundant'] += not row['redundancy']
+    return [
+        {'name': name, **group}
+        for name, group in sorted(counts.items(), key=lambda item: (-item[1]['non_redundant'], item[0] or ''))
+    ]
+
+
+def get_blast_radius(scope, ip_addresses=None):
+    """
+    Build the blast radius report of the objects in `scope`: the impacted IP addresses, non-redundant impacts
+    first, and their counts per VRF and per assigned name.
+    """
+    rows = get_blast_radius_rows(scope, ip_addresses)
+    for row in rows:
+        row['address'] = str(row['address'])
+    impacts = [row for row in rows if row['impact_id'] is not None]
+    return {
+        'ip_addresses': len(rows),
+        'impacts': len(impacts),
+        'non_redundant': sum(not row['redundancy'] for row in impacts),
+        'without_impact': len(rows) - len(impacts),
+        'by_vrf': summarize(rows, 'vrf_name'),
+        'by_assigned_to': summarize(rows, 'assigned_to'),
+        'rows': rows,
+    }
@@ -0,0 +1,163 @@
+import uuid
+
+from django.contrib.contenttypes.models import ContentType
+from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.utils import timezone
+from extras.choices import ObjectChangeActionChoices
+from extras.events import enqueue_object
+from extras.models import CustomField, ObjectChange, TaggedItem
+from ipam.models import IPAddress
+from netbox.context import current_request, events_queue
+
+from .inventory import refresh_inventory
+from .metrics import count_bulk_rows
+from .models import Impact
+
+BULK_BATCH_SIZE = 500
+
+
+def validate_impact_changes(changes, custom_field_data=None, creating=False):
+    """
+    Validate the values applied by a bulk edit once, rather than once per edited Impact. When new Impacts are
+    created, the complete prototype (defaults + changes) is validated as well.
+    """
+    prototype = Impact(**changes)
+    if custom_field_data:
+        prototype.custom_field_data.update(custom_field_data)
+
+    if creating:
+        prototype.full_clean(exclude=['ip_address', 'vrf'], validate_unique=False)
+        return
+
+    errors = {}
+    for name, value in changes.items():
+        try:
+            Impact._meta.get_field(name).clean(value, prototype)
+        except ValidationError as e:
+            errors[name] = e.error_list
+    # Only the edited custom fields are checked: the other ones keep the values of each Impact
+    custom_fields = {cf.name: cf for cf in CustomField.objects.get_for_model(Impact)}
+    for name, value in (custom_field_data or {}).items():
+        if name not in custom_fields:
+            errors[f'cf_{name}'] = [f"Unknown custom field: {name}"]
+            continue
+        try:
+            custom_fields[name].validate(value)
+        except ValidationError as e:
+            errors[f'cf_{name}'] = e.messages
+    if errors:
+        raise ValidationError(errors)
+
+
+def log_impact_changes(impacts, action, prechange_data=None, user=None, request_id=None):
+    """
+    Write the change log records of Impacts modified by bulk queries, which do not send the signals NetBox
+    relies on for change logging and event rules, and queue their events. `impacts` should have their tags
+    prefetched.
+    """
+    prechange_data = prechange_data or {}
+    request_id = request_id or uuid.uuid4()
+    objectchanges = []
+    for impact in impacts:
+        if impact.pk in prechange_data:
+            impact._prechange_snapshot = prechange_data[impact.pk]
+        objectchange = impact.to_objectchange(action)
+        objectchange.user = user
+        objectchange.user_name = getattr(user, 'username', '')
+        objectchange.request_id = request_id
+        objectchanges.append(objectchange)
+    ObjectChange.objects.bulk_create(objectchanges, batch_size=BULK_BATCH_SIZE)
+    enqueue_impact_events(impacts, action, user, request_id)
+
+
+def enqueue_impact_events(impacts, action, user=None, request_id=None):
+    """
+    Queue the event rules (webhooks, scripts...) of Impacts modified by bulk queries on the current events queue,
+    which NetBox flushes at the end of the request, or of the job chunk (see jobs.py). Nothing is queued outside of
+    an event tracking context, e.g. in management commands.
+    """
+    if user is None or current_request.get() is None:
+        return
+    queue = events_queue.get()
+    for impact in impacts:
+        enqueue_object(queue, impact, user, request_id, action)
+
+
+def update_impact_tags(impact_ids, add_tags=None, remove_tags=None):
+    object_type = ContentType.objects.get_for_model(Impact)
+    if add_tags:
+        TaggedItem.objects.bulk_create([
+            TaggedItem(content_type=object_type, object_id=pk, tag=tag)
+            for pk in impact_ids for tag in add_tags
+        ], batch_size=BULK_BATCH_SIZE, ignore_conflicts=True)
+    if remove_tags:
+        TaggedItem.objects.filter(content_type=object_type, object_id__in=impact_ids, tag__in=remove_tags).delete()
+
+
+@transaction.atomic
+def bulk_edit_impacts(ip_addresses, changes, custom_field_data=None, add_tags=None, remove_tags=None, user=None,
+                      request_id=None):
+    """
+    Apply the same changes to the Impacts of the given IP addresses (an IPAddress queryset), creating the missing
+    Impacts. Runs a fixed number of queries per batch and returns the (created, updated) lists of Impacts.
+    """
+    custom_field_data = custom_field_data or {}
+    request_id = request_id or uuid.uuid4()
+    # Locking the IP addresses (FOR UPDATE conflicts with the FOR KEY SHARE lock an insert referencing them takes)
+    # holds off concurrent creations of their Impacts: the existing and missing Impacts read below stay exact
+    pks = list(ip_addresses.values_list('pk', flat=True))
+    ip_addresses = dict(
+        IPAddress.objects.filter(pk__in=pks).select_for_update().order_by('pk').values_list('pk', 'vrf_id')
+    )
+
+    existing = {}
+    for impact in Impact.objects.filter(ip_address__in=list(ip_addresses)).prefetch_related('tags').order_by('pk'):
+        existing.setdefault(impact.ip_address_id, impact)
+    missing = [pk for pk in ip_addresses if pk not in existing]
+
+    validate_impact_changes(changes, custom_field_data)
+    if missing:
+        validate_impact_changes(changes, custom_field_data, creating=True)
+
+    # Update the existing Impacts
+    updated = list(existing.values())
+    prechange_data = {}
+    now = timezone.now()
+    for impact in updated:
+        impact.snapshot()
+        prechange_data[impact.pk] = impact._prechange_snapshot
+        for name, value in changes.items():
+            setattr(impact, name, value)
+        impact.custom_field_data.update(custom_field_data)
+        impact.last_updated = now
+    update_fields = [*changes, 'last_updated']
+    if custom_field_data:
+        update_fields.append('custom_field_data')
+    Impact.objects.bulk_update(updated, update_fields, batch_size=BULK_BATCH_SIZE)
+
+    # Create the missing ones
+    created = Impact.objects.bulk_create([
+        Impact(ip_address_id=pk, vrf_id=ip_addresses[pk], custom_field_data=dict(custom_field_data), **changes)
+        for pk in missing
+    ], batch_size=BULK_BATCH_SIZE)
+
+    impact_ids = [impact.pk for impact in updated + created]
+    update_impact_tags(impact_ids, add_tags, remove_tags)
+
+    # Record the changes with the post-change state (including tags) of every Impact
+    impacts = list(Impact.objects.filter(pk__in=impact_ids).prefetch_related('tags'))
+    created_ids = {impact.pk for impact in created}
+    log_impact_changes(
+        [impact for impact in impacts if impact.pk in created_ids], ObjectChangeActionChoices.ACTION_CREATE,
+        user=user, request_id=request_id
+    )
+    log_impact_changes(
+        [impact for impact in impacts if impact.pk not in created_ids], ObjectChangeActionChoices.ACTION_UPDATE,
+        prechange_data=prechange_data, user=user, request_id=request_id
+    )
+
+    refresh_inventory(ip_addresses)
+    count_bulk_rows('bulk_edit', len(created), len(updated))
+
+    return created, updated
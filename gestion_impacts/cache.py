@@ -0,0 +1,76 @@
+import hashlib
+import time
+
+from django.core.cache import cache
+from netbox.plugins.utils import get_plugin_config
+
+CACHE_PREFIX = 'gestion_impacts'
+
+# Incremented on every change of the listed data, which retires all the cached counts at once
+GENERATION_KEY = f'{CACHE_PREFIX}:generation'
+LAST_MODIFIED_KEY = f'{CACHE_PREFIX}:last_modified'
+VRF_CHOICES_KEY = f'{CACHE_PREFIX}:vrf_choices'
+
+# Query parameters which do not change the list count
+IGNORED_PARAMS = ('page', 'per_page', 'cursor', 'sort', 'export', 'format', 'return_url')
+
+
+def get_count_key(request, kind='count'):
+    """
+    Return the cache key of a list count (exact count or planner estimate, per `kind`) for the request's filters
+    and user (object permissions restrict the listed IP addresses).
+    """
+    params = sorted(
+        (name, value)
+        for name, values in request.GET.lists() if name not in IGNORED_PARAMS
+        for value in values if value != ''
+    )
+    digest = hashlib.sha1(repr((request.user.pk, params)).encode()).hexdigest()
+    return f'{CACHE_PREFIX}:{kind}:{get_generation()}:{digest}'
+
+
+def get_generation():
+    # Seeded from the clock, so that a flushed cache never reuses the generation (and ETags) of a previous one
+    return cache.get_or_set(GENERATION_KEY, lambda: time.time_ns() // 1000, None)
+
+
+def get_last_modified():
+    """
+    Return the time (seconds since the epoch) of the last change of the listed data, as far as the cache knows.
+    """
+    return cache.get_or_set(LAST_MODIFIED_KEY, lambda: int(time.time()), None)
+
+
+def get_cached(key, compute, timeout_setting):
+    """
+    Return the cached value of `key`, computing and caching it if missing. A timeout setting of 0 disables
+    caching.
+    """
+    timeout = get_plugin_config('gestion_impacts', timeout_setting)
+    if not timeout:
+        return compute()
+    value = cache.get(key)
+    if value is None:
+        value = compute()
+        cache.set(key, value, timeout)
+    return value
+
+
+def get_cached_count(request, compute, kind='count'):
+    return get_cached(get_count_key(request, kind), compute, 'count_cache_timeout')
+
+
+def get_cached_vrf_choices(compute):
+    return get_cached(VRF_CHOICES_KEY, compute, 'choices_cache_timeout')
+
+
+def invalidate_counts():
+    try:
+        cache.incr(GENERATION_KEY)
+    except ValueError:
+        cache.set(GENERATION_KEY, time.time_ns() // 1000, None)
+    cache.set(LAST_MODIFIED_KEY, int(time.time()), None)
+
+
+def invalidate_vrf_choices():
+    cache.delete(VRF_CHOICES_KEY)
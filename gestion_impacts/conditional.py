@@ -0,0 +1,34 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from .cache import get_generation, get_last_modified
+
+
+def get_validators(request, *extra):
+    """
+    Return the (ETag, Last-Modified) validators of a list response. The ETag covers the data generation (bumped on
+    every change of the listed data, see cache.invalidate_counts), the user, the query string and `extra` (e.g. the
+    user's table configuration).
+    """
+    params = sorted((name, value) for name, values in request.GET.lists() for value in values)
+    payload = repr((get_generation(), request.user.pk, params, request.META.get('HTTP_ACCEPT'), *extra))
+    return quote_etag(hashlib.sha1(payload.encode()).hexdigest()), get_last_modified()
+
+
+def get_not_modified_response(request, etag, last_modified):
+    """
+    Return a 304 Not Modified response if the request's conditional headers match the validators, else None.
+    """
+    return get_conditional_response(request, etag=etag, last_modified=last_modified)
+
+
+def set_validators(response, etag, last_modified, vary=()):
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Let the browser keep the response, but revalidate it on every use
+    patch_cache_control(response, private=True, no_cache=True)
+    if vary:
+        patch_vary_headers(response, vary)
+    return response
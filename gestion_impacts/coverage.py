@@ -0,0 +1,138 @@
+from dcim.models import DeviceRole, Site
+from django.db import connection, transaction
+from django.db.models import Count, Max, Q
+from ipam.models import VRF
+from tenancy.models import Tenant
+
+from .models import ImpactCoverage, ImpactCoverageChange, ImpactInventory
+
+# Dimensions of the coverage report: (ImpactInventory column, model of the grouping object)
+COVERAGE_DIMENSIONS = {
+    'vrf': ('vrf_pk', VRF),
+    'site': ('site_pk', Site),
+    'tenant': ('tenant_pk', Tenant),
+    'role': ('role_pk', DeviceRole),
+}
+COVERAGE_FIELDS = tuple(field for field, _ in COVERAGE_DIMENSIONS.values())
+
+# Serializes the refreshes (pg_advisory_xact_lock key)
+COVERAGE_LOCK_ID = 0x696d7061
+
+
+def mark_coverage_changes(rows):
+    """
+    Record the coverage groups of the given inventory rows, tuples of COVERAGE_FIELDS values, as outdated.
+    """
+    groups = {
+        (dimension, row[i])
+        for row in rows
+        for i, dimension in enumerate(COVERAGE_DIMENSIONS)
+    }
+    ImpactCoverageChange.objects.bulk_create([
+        ImpactCoverageChange(dimension=dimension, object_id=object_id) for dimension, object_id in groups
+    ])
+
+
+def get_group_filter(field, object_ids):
+    query = Q(**{f'{field}__in': [pk for pk in object_ids if pk is not None]})
+    if None in object_ids:
+        query |= Q(**{f'{field}__isnull': True})
+    return query
+
+
+def refresh_coverage(full=False):
+    """
+    Recompute the coverage groups recorded as outdated, or all of them if `full` is set or the report has never
+    been computed. Each group is counted with one GROUP BY query over the inventory, so the cost depends on the
+    changes rather than on the inventory size. Returns the number of recomputed groups by dimension.
+    """
+    refreshed = {}
+    with transaction.atomic():
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_xact_lock(%s)', [COVERAGE_LOCK_ID])
+
+        last_change = ImpactCoverageChange.objects.aggregate(last=Max('pk'))['last']
+        if full or not ImpactCoverage.objects.exists():
+            ImpactCoverage.objects.all().delete()
+            outdated = {dimension: None for dimension in COVERAGE_DIMENSIONS}
+        else:
+            outdated = {}
+            changes = ImpactCoverageChange.objects.filter(pk__lte=last_change or 0)
+            for dimension, object_id in changes.values_list('dimension', 'object_id').distinct():
+                outdated.setdefault(dimension, set()).add(object_id)
+
+        for dimension, object_ids in outdated.items():
+            field, _ = COVERAGE_DIMENSIONS[dimension]
+            inventory = ImpactInventory.objects.all()
+            if object_ids is not None:
+                ImpactCoverage.objects.filter(dimension=dimension).filter(
+                    get_group_filter('object_id', object_ids)
+                ).delete()
+                inventory = inventory.filter(get_group_filter(field, object_ids))
+            groups = inventory.values(field).annotate(
+                ip_addresses=Count('pk'),
+                impacts=Count('impact_id'),
+                non_redundant=Count('impact_id', filter=Q(redundancy=False)),
+            ).order_by()
+            ImpactCoverage.objects.bulk_create([
+                ImpactCoverage(
+                    dimension=dimension,
+                    object_id=group[field],
+                    ip_addresses=group['ip_addresses'],
+                    impacts=group['impacts'],
+                    non_redundant=group['non_redundant'],
+                )
+                for group in groups
+            ])
+            refreshed[dimension] = len(groups) if object_ids is None else len(object_ids)
+
+        if last_change is not None:
+            ImpactCoverageChange.objects.filter(pk__lte=last_change).delete()
+
+    return refreshed
+
+
+def get_coverage():
+    """
+    Return the stored coverage report: the totals and, for each dimension, the groups sorted by name with their
+    counts and coverage ratios.
+    """
+    coverage = {'last_updated': None, 'totals': None}
+    groups = {dimension: [] for dimension in COVERAGE_DIMENSIONS}
+    for group in ImpactCoverage.objects.order_by('dimension', 'object_id'):
+        groups[group.dimension].append(group)
+
+    for dimension, (_, model) in COVERAGE_DIMENSIONS.items():
+        names = dict(model.objects.filter(pk__in=[g.object_id for g in groups[dimension]]).values_list('pk', 'name'))
+        coverage[dimension] = sorted(
+            (
+                {'id': group.object_id, 'name': names.get(group.object_id), **summarize_group(group)}
+                for group in groups[dimension]
+            ),
+            key=lambda group: (group['name'] is not None, group['name'] or ''),
+        )
+        for group in groups[dimension]:
+            if coverage['last_updated'] is None or group.last_updated > coverage['last_updated']:
+                coverage['last_updated'] = group.last_updated
+
+    # Every inventoried IP address belongs to exactly one VRF group (the null one included)
+    if groups['vrf']:
+        coverage['totals'] = summarize_counts(
+            sum(g.ip_addresses for g in groups['vrf']),
+            sum(g.impacts for g in groups['vrf']),
+            sum(g.non_redundant for g in groups['vrf']),
+        )
+    return coverage
+
+
+def summarize_counts(ip_addresses, impacts, non_redundant):
+    return {
+        'ip_addresses': ip_addresses,
+        'impacts': impacts,
+        'non_redundant': non_redundant,
+        'coverage': round(100 * impacts / ip_addresses, 1) if ip_addresses else None,
+    }
+
+
+def summarize_group(group):
+    return summarize_counts(group.ip_addresses, group.impacts, group.non_redundant)
@@ -7,15 +7,26 @@ from django.utils.translation import gettext_lazy as _
 from netbox.tables import columns
 from utilities.permissions import get_permission_for_model
 
-from gestion_impacts.models import Impact
+# Per-object views of an Impact, relative to the impact list URL (see urls.py)
+ACTION_PATHS = {
+    'edit': '{pk}/edit/',
+    'delete': '{pk}/delete/',
+    'changelog': '{pk}/changelog/',
+}
+
+# Record annotations read by the actions column (see get_ip_address_queryset)
+ACTIONS_COLUMN_FIELDS = ('impact_id', 'assigned_to')
 
 
 class CustomActionsColumn(columns.ActionsColumn):
 
-    def render(self, record, table, **kwargs):
-        # Skip dummy records (e.g. available VLANs) or those with no actions
-        if not getattr(record, 'pk', None) or not self.actions:
-            return ''
+    def get_render_state(self, table):
+        """
+        Resolve everything that is identical for all rows of a table: permitted actions, URL patterns,
+        the return_url appendix and the extra buttons template. Cached on the table instance.
+        """
+        if (state := getattr(table, '_actions_render_state', None)) is not None:
+            return state
 
         model = table.Meta.model
         if request := getattr(table, 'context', {}).get('request'):
@@ -23,6 +34,31 @@ class CustomActionsColumn(columns.ActionsColumn):
             url_appendix = f'return_url={quote(return_url)}'
         else:
             url_appendix = ''
+        user = getattr(request, 'user', AnonymousUser())
+
+        add_url = reverse('plugins:gestion_impacts:impact_add')
+        list_url = reverse('plugins:gestion_impacts:impact_list')
+        actions = []
+        for idx, (action, attrs) in enumerate(self.actions.items()):
+            permission = get_permission_for_model(model, attrs.permission)
+            if attrs.permission is None or user.has_perm(permission):
+                actions.append((idx, attrs, f'{list_url}{ACTION_PATHS[action]}'))
+
+        state = table._actions_render_state = {
+            'url_appendix': url_appendix,
+            'add_url': add_url,
+            'actions': actions,
+            'template': Template(self.extra_buttons) if self.extra_buttons else None,
+        }
+        return state
+
+    def render(self, record, table, **kwargs):
+        # Skip dummy records (e.g. available VLANs) or those with no actions
+        if not getattr(record, 'pk', None) or not self.actions:
+            return ''
+
+        state = self.get_render_state(table)
+        url_appendix = state['url_appendix']
 
         html = ''
 
@@ -30,42 +66,35 @@ class CustomActionsColumn(columns.ActionsColumn):
         button = None
         dropdown_class = 'secondary'
         dropdown_links = []
-        user = getattr(request, 'user', AnonymousUser())
 
-        # Retrieve the related Impact instance
-        impact_id = None
-        if hasattr(record, 'impact'):
-            impact = Impact.objects.filter(ip_address=record).first()
-            if impact:
-                impact_id = impact.pk
+        # The related Impact is resolved by the list queryset (see get_ip_address_queryset)
+        impact_id = getattr(record, 'impact_id', None)
+        # Prefills the form; left out rather than sent empty if the record lacks it
+        assigned_to = getattr(record, 'assigned_to', None)
+        params = f'assigned_to={quote(str(assigned_to))}&' if assigned_to is not None else ''
 
-        for idx, (action, attrs) in enumerate(self.actions.items()):
-            permission = get_permission_for_model(model, attrs.permission)
-            if attrs.permission is None or user.has_perm(permission):
-                # Customize the URL creation for 'edit' and 'delete' actions
-                if impact_id is not None:
-                    url = f"{reverse(
-                        f'plugins:gestion_impacts:impact_{action}',
-                        kwargs={'pk': impact_id})}?assigned_to={record.assigned_to}&"
-                else:
-                    # Redirect to the Impact creation view with the IP address as a parameter
-                    url = f"{reverse(
-                        'plugins:gestion_impacts:impact_add')}?ip_address={record.pk}&assigned_to={record.assigned_to}&"
-
-                # Render a separate button if a) only one action exists, or b) if split_actions is True
-                if len(self.actions) == 1 or (self.split_actions and idx == 0):
-                    dropdown_class = attrs.css_class
-                    button = (
-                        f'<a class="btn btn-sm btn-{attrs.css_class}" href="{url}{url_appendix}" type="button">'
-                        f'<i class="mdi mdi-{attrs.icon}"></i></a>'
-                    )
-
-                # Add dropdown menu items
-                else:
-                    dropdown_links.append(
-                        f'<li><a class="dropdown-item" href="{url}{url_appendix}">'
-                        f'<i class="mdi mdi-{attrs.icon}"></i> {attrs.title}</a></li>'
-                    )
+        for idx, attrs, url_format in state['actions']:
+            # Customize the URL creation for 'edit' and 'delete' actions
+            if impact_id is not None:
+                url = f'{url_format.format(pk=impact_id)}?{params}'
+            else:
+                # Redirect to the Impact creation view with the IP address as a parameter
+                url = f'{state["add_url"]}?ip_address={record.pk}&{params}'
+
+            # Render a separate button if a) only one action exists, or b) if split_actions is True
+            if len(self.actions) == 1 or (self.split_actions and idx == 0):
+                dropdown_class = attrs.css_class
+                button = (
+                    f'<a class="btn btn-sm btn-{attrs.css_class}" href="{url}{url_appendix}" type="button">'
+                    f'<i class="mdi mdi-{attrs.icon}"></i></a>'
+                )
+
+            # Add dropdown menu items
+            else:
+                dropdown_links.append(
+                    f'<li><a class="dropdown-item" href="{url}{url_appendix}">'
+                    f'<i class="mdi mdi-{attrs.icon}"></i> {attrs.title}</a></li>'
+                )
 
         # Create the actions dropdown menu
         toggle_text = _('Toggle Dropdown')
@@ -90,10 +119,9 @@ class CustomActionsColumn(columns.ActionsColumn):
             )
 
         # Render any extra buttons from template code
-        if self.extra_buttons:
-            template = Template(self.extra_buttons)
+        if template := state['template']:
             context = getattr(table, "context", Context())
-            context.update({'record': record})
-            html = template.render(context) + html
+            with context.update({'record': record}):
+                html = template.render(context) + html
 
         return mark_safe(html)
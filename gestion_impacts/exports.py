@@ -0,0 +1,79 @@
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+
+from .metrics import instrument_stream
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'jsonl': 'application/jsonl',
+}
+
+# Table columns which are not read from an annotation of the same name
+EXPORT_ACCESSORS = {
+    'id': 'pk',
+}
+
+
+class Echo:
+    """
+    File-like object handing back what is written to it, so that csv.writer rows can be yielded one by one.
+    """
+
+    def write(self, value):
+        return value
+
+
+def format_value(value):
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return str(value)
+
+
+def stream_csv(rows, headers):
+    writer = csv.writer(Echo())
+    yield writer.writerow(headers)
+    for row in rows:
+        yield writer.writerow(['' if value is None else format_value(value) for value in row])
+
+
+def stream_jsonl(rows, names):
+    for row in rows:
+        yield json.dumps(dict(zip(names, map(format_value, row)))) + '\n'
+
+
+def export_rows(queryset, columns, export_format='csv', filename='netbox_impacts', chunk_size=2000):
+    """
+    Stream the given columns of a queryset as CSV or JSON Lines. `columns` is a list of (name, header) tuples; rows
+    are read as tuples through a server-side cursor, so memory use does not depend on the number of rows exported.
+    """
+    if export_format not in EXPORT_FORMATS:
+        export_format = 'csv'
+    names = [name for name, _ in columns]
+    rows = queryset.values_list(*[EXPORT_ACCESSORS.get(name, name) for name in names]).iterator(chunk_size=chunk_size)
+
+    if export_format == 'jsonl':
+        content = stream_jsonl(rows, names)
+    else:
+        content = stream_csv(rows, [str(header) for _, header in columns])
+
+    content = instrument_stream(content, 'export')
+    response = StreamingHttpResponse(content, content_type=EXPORT_FORMATS[export_format])
+    response['Content-Disposition'] = f'attachment; filename="{filename}.{export_format}"'
+    return response
+
+
+def stream_yaml(objects):
+    for i, obj in enumerate(objects):
+        yield ('---\n' if i else '') + obj.to_yaml()
+
+
+def export_yaml(queryset, filename, chunk_size=2000):
+    """
+    Stream the YAML representation (to_yaml()) of the objects of a queryset, as documents separated by '---'.
+    """
+    content = instrument_stream(stream_yaml(queryset.iterator(chunk_size=chunk_size)), 'export')
+    response = StreamingHttpResponse(content, content_type='text/yaml')
+    response['Content-Disposition'] = f'attachment; filename="{filename}.yaml"'
+    return response
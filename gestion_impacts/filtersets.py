@@ -1,12 +1,64 @@
+import re
+
+import netaddr
 from django.db import models
 from django.db.models import Q
+from dcim.models import Device
 from django_filters import filters
-from ipam.models import IPAddress, VRF
+from ipam.models import IPAddress, Prefix, VRF
 from netbox.filtersets import NetBoxModelFilterSet
+from utilities.filters import MultiValueCharFilter
+from virtualization.models import VirtualMachine
+
+from .models import Impact, ImpactInventory
+from .utils import Host
+
+# Search terms which may be part of an IPv4 or IPv6 address
+ADDRESS_FRAGMENT = re.compile(r'^[0-9a-f.:]+$', re.IGNORECASE)
+
+# Filter value selecting the IP addresses of the global table
+NULL_VRF = 'null'
+
+
+def get_parent_query(prefixes, field='address'):
+    """
+    Return a Q matching the IP addresses contained in any of the given prefixes (strings), served by the inet
+    index of migration 0011. Invalid prefixes are ignored; returns None if none is valid.
+    """
+    query = None
+    for prefix in prefixes:
+        try:
+            q = Q(**{f'{field}__net_host_contained': str(netaddr.IPNetwork(prefix.strip()).cidr)})
+        except (netaddr.AddrFormatError, ValueError):
+            continue
+        query = q if query is None else query | q
+    return query
+
+
+def get_prefix_query(prefixes, field='address', vrf_field='vrf'):
+    """
+    Return a Q matching the IP addresses contained in any of the given Prefix objects, within the prefix's VRF.
+    """
+    query = Q(pk__in=[])
+    for prefix in prefixes:
+        query |= Q(**{f'{field}__net_host_contained': str(prefix.prefix), vrf_field: prefix.vrf_id})
+    return query
 
 
 class ImpactFilterSet(NetBoxModelFilterSet):
-    vrf = filters.CharFilter(method='filter_vrf_name', label='VRF Name')
+    vrf = filters.ModelMultipleChoiceFilter(
+        queryset=VRF.objects.all(),
+        method='filter_vrf',
+        null_label='Global',
+        null_value=NULL_VRF,
+        label='VRF',
+    )
+    parent = MultiValueCharFilter(method='filter_parent', label='Parent prefix')
+    prefix_id = filters.ModelMultipleChoiceFilter(
+        queryset=Prefix.objects.all(),
+        method='filter_prefix',
+        label='Prefix (ID)',
+    )
 
     class Meta:
         model = IPAddress
@@ -21,12 +73,130 @@ class ImpactFilterSet(NetBoxModelFilterSet):
         }
 
     def search(self, queryset, name, value):
-        return queryset.filter(
-            Q(ip_address__icontains=value) |
-            Q(impact__icontains=value) |
-            Q(assigned_to__icontains=value)
-        )
+        """
+        Every branch is served by an index (see migration 0009). Prefixes match the IP addresses they contain. Other
+        terms match the impact and assigned name trigram indexes of the inventory and, when they may be part of an
+        address, the host trigram index of addresses: as before, "10.0.0.1" also matches 10.0.0.10 to 10.0.0.19.
+        The inventory and address matches are on two tables, which Postgres cannot combine in one bitmap scan, so
+        each one is a subquery of its own and the IP addresses are selected from their UNION.
+        """
+        value = value.strip()
+        if not value:
+            return queryset
+
+        if '/' in value and (query := get_parent_query([value])) is not None:
+            return queryset.filter(query)
+
+        matches = ImpactInventory.objects.filter(
+            Q(impact__icontains=value) | Q(assigned_to__icontains=value)
+        ).values('ip_address_id')
+        if ADDRESS_FRAGMENT.match(value):
+            try:
+                # Complete addresses are searched in the canonical form rendered by HOST()
+                fragment = str(netaddr.IPAddress(value, flags=netaddr.INET_PTON))
+            except (netaddr.AddrFormatError, ValueError):
+                fragment = value.lower()
+            matches = matches.union(
+                IPAddress.objects.annotate(host=Host('address')).filter(host__contains=fragment).values('pk')
+            )
+        return queryset.filter(pk__in=matches)
+
+    @staticmethod
+    def filter_vrf(queryset, name, value):
+        if not value:
+            return queryset
+        query = Q(vrf_id__in=[vrf.pk for vrf in value if vrf != NULL_VRF])
+        if NULL_VRF in value:
+            query |= Q(vrf_id__isnull=True)
+        return queryset.filter(query)
+
+    @staticmethod
+    def filter_parent(queryset, name, value):
+        query = get_parent_query(value)
+        return queryset.filter(query) if query is not None else queryset.none()
+
+    @staticmethod
+    def filter_prefix(queryset, name, value):
+        return queryset.filter(get_prefix_query(value))
+
+
+class ImpactAPIFilterSet(NetBoxModelFilterSet):
+    vrf_id = filters.ModelMultipleChoiceFilter(
+        queryset=VRF.objects.all(),
+        method='filter_vrf',
+        null_label='Global',
+        null_value=NULL_VRF,
+        label='VRF (ID)',
+    )
+    vrf = filters.ModelMultipleChoiceFilter(
+        field_name='vrf__name',
+        queryset=VRF.objects.all(),
+        to_field_name='name',
+        label='VRF (name)',
+    )
+    address = MultiValueCharFilter(method='filter_address', label='Address')
+    parent = MultiValueCharFilter(method='filter_parent', label='Parent prefix')
+    prefix_id = filters.ModelMultipleChoiceFilter(
+        queryset=Prefix.objects.all(),
+        method='filter_prefix',
+        label='Prefix (ID)',
+    )
+    device_id = filters.ModelMultipleChoiceFilter(
+        field_name='ip_address__interface__device',
+        queryset=Device.objects.all(),
+        label='Device (ID)',
+    )
+    device = filters.ModelMultipleChoiceFilter(
+        field_name='ip_address__interface__device__name',
+        queryset=Device.objects.all(),
+        to_field_name='name',
+        label='Device (name)',
+    )
+    virtual_machine_id = filters.ModelMultipleChoiceFilter(
+        field_name='ip_address__vminterface__virtual_machine',
+        queryset=VirtualMachine.objects.all(),
+        label='Virtual machine (ID)',
+    )
+    virtual_machine = filters.ModelMultipleChoiceFilter(
+        field_name='ip_address__vminterface__virtual_machine__name',
+        queryset=VirtualMachine.objects.all(),
+        to_field_name='name',
+        label='Virtual machine (name)',
+    )
+
+    class Meta:
+        model = Impact
+        fields = ['id', 'impact', 'redundancy', 'ip_address']
+
+    def search(self, queryset, name, value):
+        value = value.strip()
+        if not value:
+            return queryset
+        try:
+            host = str(netaddr.IPAddress(value, flags=netaddr.INET_PTON))
+            return queryset.filter(ip_address__address__net_host=host)
+        except (netaddr.AddrFormatError, ValueError):
+            return queryset.filter(impact__icontains=value)
+
+    @staticmethod
+    def filter_vrf(queryset, name, value):
+        return ImpactFilterSet.filter_vrf(queryset, name, value)
+
+    @staticmethod
+    def filter_address(queryset, name, value):
+        hosts = []
+        for address in value:
+            try:
+                hosts.append(str(netaddr.IPAddress(address.split('/')[0], flags=netaddr.INET_PTON)))
+            except (netaddr.AddrFormatError, ValueError):
+                continue
+        return queryset.annotate(host=Host('ip_address__address')).filter(host__in=hosts)
+
+    @staticmethod
+    def filter_parent(queryset, name, value):
+        query = get_parent_query(value, field='ip_address__address')
+        return queryset.filter(query) if query is not None else queryset.none()
 
     @staticmethod
-    def filter_vrf_name(queryset, name, value):
-        return queryset.filter(vrf_name__icontains=VRF.objects.filter(id=value).values('name')[:1])
+    def filter_prefix(queryset, name, value):
+        return queryset.filter(get_prefix_query(value, field='ip_address__address', vrf_field='ip_address__vrf'))
@@ -1,14 +1,27 @@
+from dcim.models import Device, Rack, Site
 from django import forms
 from django.forms import ModelMultipleChoiceField
-from ipam.models import IPAddress, VRF
+from ipam.models import IPAddress, Prefix, VRF
 from jsonschema.exceptions import ValidationError
-from netbox.forms import NetBoxModelForm, NetBoxModelImportForm, NetBoxModelBulkEditForm, NetBoxModelFilterSetForm
+from netbox.forms import NetBoxModelForm, NetBoxModelBulkEditForm, NetBoxModelFilterSetForm
+from utilities.forms.fields import DynamicModelMultipleChoiceField
+from virtualization.models import VirtualMachine
 
+from .cache import get_cached_vrf_choices
+from .filtersets import NULL_VRF
 from .models import Impact
 
 
+def get_vrf_choices():
+    return [(NULL_VRF, 'Global'), *get_cached_vrf_choices(
+        lambda: list(VRF.objects.order_by('name', 'pk').values_list('pk', 'name'))
+    )]
+
+
 class ImpactIpAddressFilterSetForm(NetBoxModelFilterSetForm):
-    vrf = forms.ModelChoiceField(queryset=VRF.objects.all(), required=False)
+    vrf = forms.MultipleChoiceField(choices=get_vrf_choices, required=False, label='VRF')
+    parent = forms.CharField(required=False, label='Préfixe parent', help_text='Ex. 10.20.0.0/16')
+    prefix_id = DynamicModelMultipleChoiceField(queryset=Prefix.objects.all(), required=False, label='Préfixes')
     model = IPAddress
 
     def __init__(self, *args, **kwargs):
@@ -54,14 +67,15 @@ class ImpactForm(NetBoxModelForm):
         return self.instance
 
 
-class ImpactBulkImportForm(NetBoxModelImportForm):
-    class Meta:
-        model = Impact
-        fields = ('impact', 'redundancy', 'ip_address')
-
-    def __init__(self, *args, **kwargs):
-        super().__init__(*args, **kwargs)
-        self.fields.pop('tags', None)
+class ImpactBulkImportForm(forms.Form):
+    csv_file = forms.FileField(
+        label='Fichier CSV',
+        help_text='Colonnes : address, vrf (vide pour la table globale), impact, redundancy'
+    )
+    delimiter = forms.ChoiceField(
+        choices=((',', 'Virgule'), (';', 'Point-virgule'), ('\t', 'Tabulation')),
+        initial=','
+    )
 
 
 class IPAddressMultipleChoiceField(ModelMultipleChoiceField):
@@ -101,3 +115,17 @@ class ImpactBulkEditForm(NetBoxModelBulkEditForm):
         self.fields.pop('remove_tags', None)
 
     # vrf
+
+
+class BlastRadiusForm(forms.Form):
+    device_id = DynamicModelMultipleChoiceField(queryset=Device.objects.all(), required=False, label='Devices')
+    virtual_machine_id = DynamicModelMultipleChoiceField(
+        queryset=VirtualMachine.objects.all(), required=False, label='VMs'
+    )
+    site_id = DynamicModelMultipleChoiceField(queryset=Site.objects.all(), required=False, label='Sites')
+    rack_id = DynamicModelMultipleChoiceField(
+        queryset=Rack.objects.all(), required=False, label='Baies', query_params={'site_id': '$site_id'}
+    )
+
+    def get_scope(self):
+        return {name: [obj.pk for obj in self.cleaned_data.get(name) or []] for name in self.fields}
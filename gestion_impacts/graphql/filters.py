@@ -0,0 +1,14 @@
+import strawberry_django
+from netbox.graphql.filter_mixins import BaseFilterMixin, autotype_decorator
+
+from gestion_impacts import filtersets, models
+
+__all__ = (
+    'ImpactFilter',
+)
+
+
+@strawberry_django.filter(models.Impact, lookups=True)
+@autotype_decorator(filtersets.ImpactAPIFilterSet)
+class ImpactFilter(BaseFilterMixin):
+    pass
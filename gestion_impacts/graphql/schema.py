@@ -0,0 +1,17 @@
+from typing import List
+
+import strawberry
+import strawberry_django
+
+from .types import ImpactType
+
+
+@strawberry.type(name='Query')
+class ImpactQuery:
+    impact: ImpactType = strawberry_django.field()
+    impact_list: List[ImpactType] = strawberry_django.field()
+
+
+schema = [
+    ImpactQuery,
+]
@@ -0,0 +1,24 @@
+from typing import Annotated
+
+import strawberry
+import strawberry_django
+from netbox.graphql.types import NetBoxObjectType
+
+from gestion_impacts import models
+from .filters import ImpactFilter
+
+__all__ = (
+    'ImpactType',
+)
+
+
+@strawberry_django.type(models.Impact, fields='__all__', filters=ImpactFilter)
+class ImpactType(NetBoxObjectType):
+    # Related objects are joined by the query optimizer, so a list runs a fixed number of queries
+    ip_address: Annotated['IPAddressType', strawberry.lazy('ipam.graphql.types')] | None
+    vrf: Annotated['VRFType', strawberry.lazy('ipam.graphql.types')] | None
+
+    @strawberry_django.field(select_related=['ip_address__impact_inventory'])
+    def assigned_to(self) -> str | None:
+        inventory = getattr(self.ip_address, 'impact_inventory', None) if self.ip_address_id else None
+        return inventory.assigned_to if inventory else None
@@ -0,0 +1,287 @@
+import csv
+import io
+import logging
+
+from django.db import DatabaseError, connection, transaction
+from extras.choices import ObjectChangeActionChoices
+
+from .bulk import log_impact_changes
+from .inventory import refresh_inventory
+from .metrics import count_bulk_rows
+from .models import Impact
+from .utils import normalize_host, resolve_ip_addresses
+
+IMPORT_COLUMNS = ('address', 'vrf', 'vrf_id', 'impact', 'redundancy')
+# The VRF is given by name or, when names are ambiguous, by ID; both are left empty for the global table
+OPTIONAL_COLUMNS = ('vrf', 'vrf_id')
+TRUE_VALUES = {'1', 'true', 't', 'yes', 'y', 'oui', 'o', 'x'}
+FALSE_VALUES = {'', '0', 'false', 'f', 'no', 'n', 'non'}
+
+# Maximum number of row errors kept in an import result
+MAX_REPORTED_ERRORS = 1000
+
+# The table is dropped when the transaction commits. When the import runs inside an outer transaction, each chunk
+# is only a savepoint: the table then outlives the chunk, and is reused once truncated.
+CREATE_STAGING_TABLE = """
+CREATE TEMPORARY TABLE IF NOT EXISTS gestion_impacts_import_staging (
+    ip_address_id bigint PRIMARY KEY,
+    vrf_id bigint,
+    impact text NOT NULL,
+    redundancy boolean NOT NULL
+) ON COMMIT DROP
+"""
+
+TRUNCATE_STAGING_TABLE = """
+TRUNCATE gestion_impacts_import_staging
+"""
+
+COPY_STAGING_TABLE = """
+COPY gestion_impacts_import_staging (ip_address_id, vrf_id, impact, redundancy) FROM STDIN
+"""
+
+# xmax is only zero for the rows inserted by the statement, which tells created and updated Impacts apart
+UPSERT_IMPACTS = """
+INSERT INTO gestion_impacts_impact (created, last_updated, custom_field_data, impact, redundancy, ip_address_id, vrf_id)
+SELECT now(), now(), '{}'::jsonb, staging.impact, staging.redundancy, staging.ip_address_id, staging.vrf_id
+FROM gestion_impacts_import_staging AS staging
+ON CONFLICT (ip_address_id) DO UPDATE
+SET impact = EXCLUDED.impact, redundancy = EXCLUDED.redundancy, vrf_id = EXCLUDED.vrf_id, last_updated = now()
+RETURNING ip_address_id, id, xmax = 0
+"""
+
+
+class ImpactImportResult:
+
+    def __init__(self, max_errors=MAX_REPORTED_ERRORS):
+        self.max_errors = max_errors
+        self.rows = 0
+        self.created = 0
+        self.updated = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, error):
+        self.error_count += 1
+        if self.max_errors is None or len(self.errors) < self.max_errors:
+            self.errors.append((line, error))
+
+
+def parse_redundancy(value):
+    if isinstance(value, bool):
+        return value
+    value = str(value or '').strip().lower()
+    if value in TRUE_VALUES:
+        return True
+    if value in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid redundancy value: {value}")
+
+
+def parse_vrf_id(value):
+    value = str(value if value is not None else '').strip()
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f"Invalid VRF ID: {value}")
+
+
+def match_ip_address(candidates, host, vrf_name, vrf_id):
+    """
+    Return the (IPAddress pk, VRF pk) of the candidate IP addresses of a host matching the given VRF (by ID if
+    set, by name otherwise, global table if neither is). Raises ValueError unless exactly one matches.
+    """
+    if vrf_id is not None:
+        matches = [(pk, pk_vrf) for pk, pk_vrf, _ in candidates if pk_vrf == vrf_id]
+        vrf = f"VRF {vrf_id}"
+    elif vrf_name is not None:
+        matches = [(pk, pk_vrf) for pk, pk_vrf, name in candidates if name == vrf_name]
+        vrf = f"VRF {vrf_name}"
+    else:
+        matches = [(pk, pk_vrf) for pk, pk_vrf, _ in candidates if pk_vrf is None]
+        vrf = "the global table"
+    if not matches:
+        raise ValueError(f"IP address {host} not found in {vrf}")
+    if len({pk_vrf for _, pk_vrf in matches}) > 1:
+        raise ValueError(f"Several VRFs are named {vrf_name}: set vrf_id instead")
+    if len(matches) > 1:
+        raise ValueError(f"IP address {host} exists {len(matches)} times in {vrf}")
+    return matches[0]
+
+
+def get_protected_ip_addresses(ip_address_ids, impacts):
+    """
+    Return the pks of the given IP addresses whose existing Impact is not part of the `impacts` queryset (e.g. the
+    Impacts the user may change).
+    """
+    existing = Impact.objects.filter(ip_address__in=ip_address_ids).values_list('ip_address_id', flat=True)
+    allowed = impacts.filter(ip_address__in=ip_address_ids).values_list('ip_address_id', flat=True)
+    return set(existing) - set(allowed)
+
+
+def parse_chunk(lines, result, ip_addresses=None, impacts=None):
+    """
+    Validate a chunk of (line number, row) tuples and resolve their IP addresses, among the `ip_addresses`
+    queryset, with a single query. Existing Impacts outside of the `impacts` queryset are not overwritten. Returns
+    the staging rows keyed by IP address pk and the IP address pk of each valid line; an IP address appearing
+    several times is reported as an error after its first line.
+    """
+    parsed = []
+    for line, row in lines:
+        try:
+            host = normalize_host(row.get('address') or '')
+            impact = str(row.get('impact') or '').strip()
+            if not impact:
+                raise ValueError("Impact is required")
+            parsed.append((line, host, str(row.get('vrf') or '').strip() or None, parse_vrf_id(row.get('vrf_id')),
+                           impact, parse_redundancy(row.get('redundancy'))))
+        except ValueError as e:
+            result.add_error(line, str(e))
+
+    candidates = resolve_ip_addresses((host for _, host, *_ in parsed), ip_addresses)
+    staging = {}
+    first_lines = {}
+    for line, host, vrf_name, vrf_id, impact, redundancy in parsed:
+        try:
+            ip_address_id, vrf_id = match_ip_address(candidates.get(host, []), host, vrf_name, vrf_id)
+        except ValueError as e:
+            result.add_error(line, str(e))
+            continue
+        if ip_address_id in staging:
+            result.add_error(line, f"IP address {host} already imported from line {first_lines[ip_address_id]}")
+            continue
+        staging[ip_address_id] = (ip_address_id, vrf_id, impact, redundancy)
+        first_lines[ip_address_id] = line
+
+    if impacts is not None and staging:
+        for ip_address_id in get_protected_ip_addresses(list(staging), impacts):
+            del staging[ip_address_id]
+            result.add_error(first_lines.pop(ip_address_id), "Permission denied to change the existing impact")
+    return staging, {line: ip_address_id for ip_address_id, line in first_lines.items()}
+
+
+def load_chunk(staging, user=None, request_id=None):
+    """
+    COPY the staging rows into a temporary table and upsert them into the Impacts. Returns a dict mapping each IP
+    address pk to an (Impact pk, created) tuple.
+    """
+    with transaction.atomic():
+        prechange_data = {}
+        for impact in Impact.objects.filter(ip_address__in=list(staging)).prefetch_related('tags'):
+            impact.snapshot()
+            prechange_data[impact.pk] = impact._prechange_snapshot
+
+        with connection.cursor() as cursor:
+            cursor.execute(CREATE_STAGING_TABLE)
+            cursor.execute(TRUNCATE_STAGING_TABLE)
+            with cursor.cursor.copy(COPY_STAGING_TABLE) as copy:
+                for row in staging.values():
+                    copy.write_row(row)
+            cursor.execute(UPSERT_IMPACTS)
+            loaded = {ip_address_id: (pk, inserted) for ip_address_id, pk, inserted in cursor.fetchall()}
+
+        impacts = list(Impact.objects.filter(pk__in=[pk for pk, _ in loaded.values()]).prefetch_related('tags'))
+        log_impact_changes(
+            [impact for impact in impacts if impact.pk in prechange_data], ObjectChangeActionChoices.ACTION_UPDATE,
+            prechange_data=prechange_data, user=user, request_id=request_id
+        )
+        log_impact_changes(
+            [impact for impact in impacts if impact.pk not in prechange_data], ObjectChangeActionChoices.ACTION_CREATE,
+            user=user, request_id=request_id
+        )
+        refresh_inventory(staging)
+
+    return loaded
+
+
+def import_impacts(file, delimiter=',', chunk_size=5000, user=None, request_id=None, ip_addresses=None,
+                   impacts=None):
+    """
+    Stream a CSV file of "address, vrf (or vrf_id), impact, redundancy" rows into Impacts, chunk by chunk. Each
+    chunk is committed on its own; invalid rows are reported in the returned ImpactImportResult without aborting
+    the import. `ip_addresses` and `impacts` restrict the target IP addresses and the Impacts which may be updated.
+    """
+    logger = logging.getLogger('gestion_impacts.imports')
+    result = ImpactImportResult()
+    reader = csv.DictReader(io.TextIOWrapper(file, encoding='utf-8-sig', newline=''), delimiter=delimiter)
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames or []]
+    if missing := set(IMPORT_COLUMNS) - set(OPTIONAL_COLUMNS) - set(reader.fieldnames):
+        result.add_error(1, f"Missing columns: {', '.join(sorted(missing))}")
+        return result
+
+    def flush(lines):
+        staging, _ = parse_chunk(lines, result, ip_addresses, impacts)
+        if not staging:
+            return
+        try:
+            loaded = load_chunk(staging, user=user, request_id=request_id)
+        except DatabaseError as e:
+            logger.warning(f"Failed to load lines {lines[0][0]}-{lines[-1][0]}: {e}")
+            result.add_error(lines[0][0], f"Lines {lines[0][0]} to {lines[-1][0]} were not imported: {e}")
+            return
+        created = sum(inserted for _, inserted in loaded.values())
+        result.created += created
+        result.updated += len(loaded) - created
+        count_bulk_rows('import', created, len(loaded) - created)
+        logger.debug(f"Imported {result.rows} rows")
+
+    lines = []
+    # Line 1 is the header
+    for line, row in enumerate(reader, start=2):
+        result.rows += 1
+        lines.append((line, row))
+        if len(lines) >= chunk_size:
+            flush(lines)
+            lines = []
+    if lines:
+        flush(lines)
+
+    return result
+
+
+def upsert_impacts(items, batch_size=5000, user=None, request_id=None, ip_addresses=None, impacts=None):
+    """
+    Create or update the Impacts described by a list of {address, vrf (or vrf_id), impact, redundancy} dicts, one
+    batch (and transaction) at a time. Returns the ImpactImportResult and a list holding the outcome of each item,
+    in order. `ip_addresses` and `impacts` restrict the targets as in import_impacts().
+    """
+    logger = logging.getLogger('gestion_impacts.imports')
+    result = ImpactImportResult(max_errors=None)
+    outcomes = {}
+
+    for start in range(0, len(items), batch_size):
+        lines = []
+        for index, item in enumerate(items[start:start + batch_size], start=start):
+            result.rows += 1
+            if isinstance(item, dict):
+                lines.append((index, item))
+            else:
+                result.add_error(index, "Item must be an object")
+
+        staging, resolved = parse_chunk(lines, result, ip_addresses, impacts)
+        if not staging:
+            continue
+        try:
+            loaded = load_chunk(staging, user=user, request_id=request_id)
+        except DatabaseError as e:
+            logger.warning(f"Failed to upsert items {start}-{start + len(lines) - 1}: {e}")
+            for index in resolved:
+                result.add_error(index, f"Not saved: {e}")
+            continue
+        for index, ip_address_id in resolved.items():
+            outcomes[index] = loaded[ip_address_id]
+        created = sum(inserted for _, inserted in loaded.values())
+        result.created += created
+        result.updated += len(loaded) - created
+        count_bulk_rows('upsert', created, len(loaded) - created)
+
+    errors = dict(result.errors)
+    results = []
+    for index in range(len(items)):
+        if index in outcomes:
+            pk, inserted = outcomes[index]
+            results.append({'index': index, 'status': 'created' if inserted else 'updated', 'id': pk})
+        else:
+            results.append({'index': index, 'status': 'error', 'error': errors.get(index)})
+    return result, results
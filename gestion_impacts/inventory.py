@@ -0,0 +1,139 @@
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import F, Value, CharField, Q
+from django.db.models.fields.json import KeyTextTransform
+from django.db.models.functions import Coalesce
+from ipam.models import IPAddress
+
+from .cache import invalidate_counts
+from .coverage import COVERAGE_FIELDS, mark_coverage_changes
+from .models import ImpactInventory
+
+# Columns of ImpactInventory computed from the live IPAM data
+INVENTORY_FIELDS = ('vrf_name', 'assigned_to', 'impact_id', 'impact', 'redundancy', *COVERAGE_FIELDS)
+
+
+def get_inventoried_ip_addresses(queryset=None):
+    """
+    Return the IP addresses listed by the plugin: active, and either unassigned or assigned to an interface.
+    """
+    if queryset is None:
+        queryset = IPAddress.objects.all()
+    return queryset.filter(status='active').filter(
+        Q(assigned_object_type__model='interface', assigned_object_type__app_label='dcim') |
+        Q(assigned_object_type__model='vminterface', assigned_object_type__app_label='virtualization') |
+        Q(assigned_object_id__isnull=True)
+    )
+
+
+def get_live_queryset(queryset=None):
+    """
+    Return the inventoried IP addresses annotated with the live values of the inventory columns.
+    """
+    # Everything is resolved through LEFT JOINs in a single pass: the reverse
+    # FK from Impact, and the `interface`/`vminterface` generic relations that
+    # Interface.ip_addresses and VMInterface.ip_addresses expose on IPAddress.
+    return get_inventoried_ip_addresses(queryset).annotate(
+        vrf_name=F('vrf__name'),
+        device_name=F('interface__device__name'),
+        vm_name=F('vminterface__virtual_machine__name'),
+        assigned_to=Coalesce(
+            F('device_name'),
+            F('vm_name'),
+            KeyTextTransform('nom_long', 'custom_field_data', output_field=CharField()),
+            Value('Not Assigned', output_field=CharField())
+        ),
+        impact_id=F('ipaddress__id'),
+        impact=F('ipaddress__impact'),
+        redundancy=F('ipaddress__redundancy'),
+        vrf_pk=F('vrf_id'),
+        site_pk=Coalesce(F('interface__device__site_id'), F('vminterface__virtual_machine__site_id')),
+        tenant_pk=Coalesce(
+            F('tenant_id'), F('interface__device__tenant_id'), F('vminterface__virtual_machine__tenant_id')
+        ),
+        role_pk=Coalesce(F('interface__device__role_id'), F('vminterface__virtual_machine__role_id')),
+    )
+
+
+def get_inventory_rows(ip_address_ids):
+    """
+    Return the live inventory values of the given IP addresses, keyed by IP address pk.
+    """
+    rows = {}
+    queryset = get_live_queryset(IPAddress.objects.filter(pk__in=ip_address_ids))
+    for row in queryset.values('pk', *INVENTORY_FIELDS).order_by('pk', 'impact_id'):
+        # Keep the first Impact if an IP address has several
+        rows.setdefault(row.pop('pk'), row)
+    return rows
+
+
+def write_inventory_rows(ip_address_ids, rows):
+    # The listed data changes: retire the cached list counts once committed
+    transaction.on_commit(invalidate_counts)
+    with transaction.atomic():
+        # Both the previous and the new coverage groups of the rows are outdated
+        previous = ImpactInventory.objects.filter(ip_address__in=ip_address_ids).values_list(*COVERAGE_FIELDS)
+        mark_coverage_changes(chain(
+            previous, (tuple(values[field] for field in COVERAGE_FIELDS) for values in rows.values())
+        ))
+        ImpactInventory.objects.filter(ip_address__in=ip_address_ids).exclude(ip_address__in=list(rows)).delete()
+        ImpactInventory.objects.bulk_create(
+            [ImpactInventory(ip_address_id=pk, **values) for pk, values in rows.items()],
+            update_conflicts=True,
+            unique_fields=['ip_address'],
+            update_fields=INVENTORY_FIELDS,
+        )
+
+
+def refresh_inventory(ip_address_ids):
+    """
+    Recompute the inventory rows of the given IP addresses (any iterable of pks, including a values_list queryset).
+    """
+    ip_address_ids = list(ip_address_ids)
+    if ip_address_ids:
+        write_inventory_rows(ip_address_ids, get_inventory_rows(ip_address_ids))
+
+
+def rebuild_inventory(dry_run=False, chunk_size=5000):
+    """
+    Compare the whole inventory with the live data and return the drift found, by kind. Unless dry_run is set,
+    the drifted rows are fixed along the way.
+    """
+    drift = {'missing': 0, 'stale': 0, 'orphaned': 0}
+
+    def check_chunk(ip_address_ids):
+        live = get_inventory_rows(ip_address_ids)
+        stored = {
+            row.pop('ip_address'): row
+            for row in ImpactInventory.objects.filter(ip_address__in=ip_address_ids).values('ip_address', *INVENTORY_FIELDS)
+        }
+        drifted = []
+        for pk, values in live.items():
+            if pk not in stored:
+                drift['missing'] += 1
+                drifted.append(pk)
+            elif stored[pk] != values:
+                drift['stale'] += 1
+                drifted.append(pk)
+        if drifted and not dry_run:
+            write_inventory_rows(drifted, {pk: live[pk] for pk in drifted})
+
+    chunk = []
+    ip_address_ids = get_inventoried_ip_addresses().order_by('pk').values_list('pk', flat=True)
+    for pk in ip_address_ids.iterator(chunk_size=chunk_size):
+        chunk.append(pk)
+        if len(chunk) >= chunk_size:
+            check_chunk(chunk)
+            chunk = []
+    if chunk:
+        check_chunk(chunk)
+
+    orphaned = ImpactInventory.objects.exclude(ip_address__in=get_inventoried_ip_addresses().values('pk'))
+    drift['orphaned'] = orphaned.count()
+    if drift['orphaned'] and not dry_run:
+        with transaction.atomic():
+            mark_coverage_changes(orphaned.values_list(*COVERAGE_FIELDS))
+            orphaned.delete()
+
+    return drift
@@ -0,0 +1,166 @@
+import logging
+from datetime import timedelta
+from types import SimpleNamespace
+
+from core.choices import JobStatusChoices
+from core.models import Job, ObjectType
+from django.core.exceptions import ValidationError
+from django.db import DatabaseError, transaction
+from django.utils import timezone
+from extras.models import Tag
+from ipam.models import IPAddress
+from netbox.context_managers import event_tracking
+
+from .bulk import bulk_edit_impacts
+from .coverage import refresh_coverage
+from .models import Impact
+
+# Maximum number of per-row failures kept in the job data
+MAX_REPORTED_FAILURES = 1000
+
+BULK_EDIT_JOB_NAME = 'Bulk edit of {count} impacts'
+COVERAGE_JOB_NAME = 'Impact coverage refresh'
+# Longest delay (minutes) before retrying a failing coverage refresh
+MAX_COVERAGE_RETRY_DELAY = 24 * 60
+
+
+def bulk_edit_impacts_job(job, ip_address_ids, changes, custom_field_data=None, add_tag_ids=None,
+                          remove_tag_ids=None, chunk_size=500, request_id=None):
+    """
+    Background job applying a bulk edit in chunks, each committed on its own. Progress and per-row failures are
+    reported in job.data.
+    """
+    logger = logging.getLogger('gestion_impacts.jobs.bulk_edit_impacts')
+    job.start()
+    job.data = {
+        'total': len(ip_address_ids),
+        'processed': 0,
+        'created': 0,
+        'updated': 0,
+        'failed': 0,
+        'failures': [],
+    }
+    job.save(update_fields=['data'])
+    options = {
+        'changes': changes,
+        'custom_field_data': custom_field_data,
+        'add_tags': list(Tag.objects.filter(pk__in=add_tag_ids or [])),
+        'remove_tags': list(Tag.objects.filter(pk__in=remove_tag_ids or [])),
+        'user': job.user,
+        'request_id': request_id or job.job_id,
+    }
+
+    def record_failure(pk, error):
+        job.data['failed'] += 1
+        if len(job.data['failures']) < MAX_REPORTED_FAILURES:
+            address = IPAddress.objects.filter(pk=pk).values_list('address', flat=True).first()
+            job.data['failures'].append({'ip_address': pk, 'address': str(address), 'error': str(error)})
+
+    # Stands for the request in NetBox's event tracking, which flushes the events of each chunk to the event rules
+    request = SimpleNamespace(id=options['request_id'], user=job.user, META={}, GET={}, POST={}, path='')
+
+    try:
+        for i in range(0, len(ip_address_ids), chunk_size):
+            chunk = ip_address_ids[i:i + chunk_size]
+            try:
+                with event_tracking(request), transaction.atomic():
+                    created, updated = bulk_edit_impacts(IPAddress.objects.filter(pk__in=chunk), **options)
+                job.data['created'] += len(created)
+                job.data['updated'] += len(updated)
+            except DatabaseError as e:
+                # Retry the chunk row by row to isolate the failing IP addresses
+                logger.warning(f"Chunk {i // chunk_size + 1} failed ({e}), retrying row by row")
+                for pk in chunk:
+                    try:
+                        with event_tracking(request), transaction.atomic():
+                            created, updated = bulk_edit_impacts(IPAddress.objects.filter(pk=pk), **options)
+                        job.data['created'] += len(created)
+                        job.data['updated'] += len(updated)
+                    except DatabaseError as e:
+                        record_failure(pk, e)
+            job.data['processed'] += len(chunk)
+            job.save(update_fields=['data'])
+
+    except ValidationError as e:
+        # The same values are applied to every row, so a validation error fails the whole edit
+        job.terminate(status=JobStatusChoices.STATUS_FAILED, error=", ".join(e.messages))
+    except Exception as e:
+        logger.exception("Bulk edit of impacts failed")
+        job.terminate(status=JobStatusChoices.STATUS_ERRORED, error=repr(e))
+    else:
+        # Per-row failures are listed in job.data; the rows of the other chunks are committed
+        job.terminate()
+
+
+def get_bulk_edit_jobs():
+    """
+    Return the bulk edit jobs of the plugin.
+    """
+    prefix, suffix = BULK_EDIT_JOB_NAME.split('{count}')
+    return Job.objects.filter(
+        name__startswith=prefix, name__endswith=suffix, object_id=ObjectType.objects.get_for_model(Impact).pk,
+    )
+
+
+def get_coverage_jobs():
+    """
+    Return the coverage refresh jobs which are pending, scheduled or running.
+    """
+    return Job.objects.filter(
+        name=COVERAGE_JOB_NAME,
+        object_id=ObjectType.objects.get_for_model(Impact).pk,
+        status__in=JobStatusChoices.ENQUEUED_STATE_CHOICES,
+    )
+
+
+def schedule_coverage_refresh(interval, full=False, delay=None, failures=0, user=None, current_job=None):
+    """
+    Enqueue the recurring coverage refresh, every `interval` minutes and first in `delay` minutes (now if None),
+    unless another one is already enqueued. Returns the (job, created) tuple.
+    """
+    pending = get_coverage_jobs()
+    if current_job is not None:
+        pending = pending.exclude(pk=current_job.pk)
+    if job := pending.order_by('pk').first():
+        return job, False
+    job = Job.enqueue(
+        refresh_coverage_job,
+        instance=ObjectType.objects.get_for_model(Impact),
+        name=COVERAGE_JOB_NAME,
+        user=user,
+        schedule_at=timezone.now() + timedelta(minutes=delay) if delay else None,
+        interval=interval,
+        full=full,
+        failures=failures,
+    )
+    return job, True
+
+
+def refresh_coverage_job(job, full=False, failures=0):
+    """
+    Background job refreshing the outdated groups of the coverage report, or all of them if `full` is set. When
+    enqueued with an interval (minutes), the job schedules its next run once done, with the same options. After
+    `failures` consecutive errors, the next run is delayed by interval * 2^failures, up to a day.
+    """
+    logger = logging.getLogger('gestion_impacts.jobs.refresh_coverage')
+    job.start()
+    try:
+        job.data = {'refreshed': refresh_coverage(full=full)}
+        job.save(update_fields=['data'])
+    except Exception as e:
+        logger.exception("Refresh of the impact coverage failed")
+        job.terminate(status=JobStatusChoices.STATUS_ERRORED, error=repr(e))
+        failures += 1
+    else:
+        job.terminate()
+        failures = 0
+
+    if job.interval:
+        schedule_coverage_refresh(
+            job.interval,
+            full=full,
+            delay=min(job.interval * 2 ** failures, MAX_COVERAGE_RETRY_DELAY),
+            failures=failures,
+            user=job.user,
+            current_job=job,
+        )
@@ -0,0 +1,84 @@
+import json
+import platform
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from gestion_impacts import benchmarks
+from gestion_impacts.models import Impact
+
+
+class Command(BaseCommand):
+    help = "Time the plugin's hot paths (list, search, filters, export, bulk edit, API) on a synthetic dataset"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--seed', action='store_true', help="Create the synthetic dataset before running the benchmarks"
+        )
+        parser.add_argument(
+            '--cleanup', action='store_true', help="Delete the synthetic dataset after running the benchmarks"
+        )
+        parser.add_argument('--no-run', action='store_true', help="Only seed and/or clean up the dataset")
+        parser.add_argument('--vrfs', type=int, default=4, help="Number of VRFs")
+        parser.add_argument('--devices', type=int, default=200, help="Number of devices")
+        parser.add_argument('--vms', type=int, default=200, help="Number of virtual machines")
+        parser.add_argument('--interfaces', type=int, default=4, help="Interfaces per device and per VM")
+        parser.add_argument('--ip-addresses', type=int, default=10000, help="Number of IP addresses")
+        parser.add_argument(
+            '--impact-ratio', type=float, default=0.5, help="Fraction of the IP addresses having an Impact"
+        )
+        parser.add_argument('--random-seed', type=int, default=0, help="Seed of the synthetic data")
+        parser.add_argument('--per-page', type=int, default=50, help="Page size of the list benchmarks")
+        parser.add_argument('--repeat', type=int, default=3, help="Runs per benchmark")
+        parser.add_argument('--only', nargs='+', help="Names of the benchmarks to run")
+        parser.add_argument('--user', help="Superuser to run the benchmarks as (default: the first superuser)")
+        parser.add_argument('--output', help="Write the results as JSON to this file")
+
+    def handle(self, *args, **options):
+        log = self.stdout.write
+
+        if options['seed']:
+            if Impact.objects.filter(ip_address__vrf__name__startswith=benchmarks.BENCHMARK_PREFIX).exists():
+                raise CommandError("A benchmark dataset already exists; run with --cleanup --no-run first.")
+            benchmarks.seed_dataset(
+                vrfs=options['vrfs'],
+                devices=options['devices'],
+                vms=options['vms'],
+                interfaces=options['interfaces'],
+                ip_addresses=options['ip_addresses'],
+                impact_ratio=options['impact_ratio'],
+                seed=options['random_seed'],
+                log=log,
+            )
+
+        if not options['no_run']:
+            users = get_user_model().objects.filter(is_superuser=True, is_active=True)
+            if options['user']:
+                users = users.filter(username=options['user'])
+            if (user := users.order_by('pk').first()) is None:
+                raise CommandError("No active superuser found to run the benchmarks as.")
+
+            report = {
+                'date': datetime.now(timezone.utc).isoformat(),
+                'netbox_version': settings.VERSION,
+                'python_version': platform.python_version(),
+                'postgresql_version': connection.pg_version,
+                'options': {
+                    name: options[name] for name in ('per_page', 'repeat', 'vrfs', 'devices', 'vms', 'interfaces',
+                                                     'ip_addresses', 'impact_ratio', 'random_seed')
+                },
+                'dataset': benchmarks.get_dataset_stats(),
+                'results': benchmarks.run_benchmarks(
+                    user, per_page=options['per_page'], repeat=options['repeat'], only=options['only'], log=log
+                ),
+            }
+            if options['output']:
+                with open(options['output'], 'w') as f:
+                    json.dump(report, f, indent=2, default=str)
+                self.stdout.write(self.style.SUCCESS(f"Results written to {options['output']}"))
+
+        if options['cleanup']:
+            benchmarks.delete_dataset(log=log)
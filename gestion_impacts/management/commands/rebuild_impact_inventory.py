@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from gestion_impacts.inventory import rebuild_inventory
+
+
+class Command(BaseCommand):
+    help = "Rebuild the impact inventory from the IPAM data and report any drift"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--check', action='store_true', help="Only report the drift, without fixing it"
+        )
+        parser.add_argument(
+            '--chunk-size', type=int, default=5000, help="Number of IP addresses compared per query"
+        )
+
+    def handle(self, *args, **options):
+        drift = rebuild_inventory(dry_run=options['check'], chunk_size=options['chunk_size'])
+
+        for kind, count in drift.items():
+            self.stdout.write(f"{kind}: {count}")
+        if not any(drift.values()):
+            self.stdout.write(self.style.SUCCESS("The impact inventory is up to date."))
+        elif options['check']:
+            self.stdout.write(self.style.WARNING("The impact inventory has drifted; run without --check to fix it."))
+        else:
+            self.stdout.write(self.style.SUCCESS("The impact inventory has been rebuilt."))
@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+from netbox.plugins.utils import get_plugin_config
+
+from gestion_impacts.coverage import refresh_coverage
+from gestion_impacts.jobs import schedule_coverage_refresh
+
+
+class Command(BaseCommand):
+    help = "Refresh the outdated groups of the impact coverage report, or schedule the recurring refresh job"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--full', action='store_true', help="Recompute every group instead of the outdated ones"
+        )
+        parser.add_argument(
+            '--schedule', action='store_true',
+            help="Enqueue the background job refreshing the report every coverage_refresh_interval minutes"
+        )
+
+    def handle(self, *args, **options):
+        if options['schedule']:
+            interval = get_plugin_config('gestion_impacts', 'coverage_refresh_interval')
+            job, created = schedule_coverage_refresh(interval, full=options['full'])
+            if not created:
+                self.stdout.write(self.style.WARNING(f"The coverage refresh is already scheduled (job {job.pk})."))
+                return
+            self.stdout.write(self.style.SUCCESS(f"Scheduled the coverage refresh every {interval} minutes (job {job.pk})."))
+            return
+
+        refreshed = refresh_coverage(full=options['full'])
+        for dimension, count in refreshed.items():
+            self.stdout.write(f"{dimension}: {count}")
+        self.stdout.write(self.style.SUCCESS("The impact coverage report is up to date."))
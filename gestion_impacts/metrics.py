@@ -0,0 +1,118 @@
+import time
+from contextlib import contextmanager
+
+from django.db import connection
+from netbox.plugins.utils import get_plugin_config
+from prometheus_client import Counter, Histogram
+
+# Collected in prometheus_client's default registry, which django-prometheus exposes on /metrics
+REQUEST_SECONDS = Histogram(
+    'gestion_impacts_request_seconds', 'Time spent handling a request, by view', ['view']
+)
+QUERY_SECONDS = Histogram(
+    'gestion_impacts_query_seconds', 'Time spent in SQL queries per request, by view', ['view']
+)
+QUERIES = Histogram(
+    'gestion_impacts_queries', 'SQL queries per request, by view', ['view'],
+    buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 5000),
+)
+STAGE_SECONDS = Histogram(
+    'gestion_impacts_stage_seconds', 'Time spent in a stage of a request (count, render), by view', ['view', 'stage']
+)
+ROWS = Histogram(
+    'gestion_impacts_rows', 'Rows listed, exported or edited per request, by view', ['view'],
+    buckets=(0, 10, 50, 100, 500, 1000, 5000, 10000, 50000, 100000, 500000, 1000000),
+)
+BULK_ROWS = Counter(
+    'gestion_impacts_bulk_rows', 'Impacts written by bulk operations', ['operation', 'result']
+)
+
+
+def metrics_enabled():
+    return get_plugin_config('gestion_impacts', 'metrics_enabled')
+
+
+class RequestMetrics:
+    """
+    Metrics of a single request: a database execute wrapper counting and timing its queries, plus the stages and
+    row count reported by the view.
+    """
+
+    def __init__(self, view, enabled=True):
+        self.view = view
+        self.enabled = enabled
+        self.queries = 0
+        self.query_time = 0.0
+        self.rows = None
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries += 1
+            self.query_time += time.perf_counter() - start
+
+    @contextmanager
+    def stage(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self.enabled:
+                STAGE_SECONDS.labels(self.view, name).observe(time.perf_counter() - start)
+
+    def observe(self, duration):
+        REQUEST_SECONDS.labels(self.view).observe(duration)
+        QUERY_SECONDS.labels(self.view).observe(self.query_time)
+        QUERIES.labels(self.view).observe(self.queries)
+        if self.rows is not None:
+            ROWS.labels(self.view).observe(self.rows)
+
+
+@contextmanager
+def instrument(view):
+    """
+    Measure the enclosed block as one request of `view`. Yields the RequestMetrics, on which the view can time
+    stages and report its row count; nothing is recorded when the metrics_enabled setting is off.
+    """
+    if not metrics_enabled():
+        yield RequestMetrics(view, enabled=False)
+        return
+    metrics = RequestMetrics(view)
+    start = time.perf_counter()
+    try:
+        with connection.execute_wrapper(metrics):
+            yield metrics
+    finally:
+        metrics.observe(time.perf_counter() - start)
+
+
+def instrument_stream(content, view):
+    """
+    Wrap the iterator of a streaming response, measuring it as one request of `view` once fully sent. Each item is
+    counted as a row.
+    """
+    with instrument(view) as metrics:
+        metrics.rows = 0
+        for chunk in content:
+            metrics.rows += 1
+            yield chunk
+
+
+def count_bulk_rows(operation, created, updated):
+    if metrics_enabled():
+        BULK_ROWS.labels(operation, 'created').inc(created)
+        BULK_ROWS.labels(operation, 'updated').inc(updated)
+
+
+class InstrumentedViewMixin:
+    """
+    Measure every request of the view; the RequestMetrics are available as self.metrics.
+    """
+    metrics_view = None
+
+    def dispatch(self, request, *args, **kwargs):
+        with instrument(self.metrics_view or self.__class__.__name__) as metrics:
+            self.metrics = metrics
+            return super().dispatch(request, *args, **kwargs)
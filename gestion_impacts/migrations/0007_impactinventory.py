@@ -0,0 +1,56 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+POPULATE_INVENTORY = """
+INSERT INTO gestion_impacts_impactinventory (ip_address_id, vrf_name, assigned_to, impact_id, impact, redundancy)
+SELECT DISTINCT ON (ip.id)
+    ip.id,
+    vrf.name,
+    COALESCE(device.name, vm.name, ip.custom_field_data ->> 'nom_long', 'Not Assigned'),
+    impact.id,
+    impact.impact,
+    impact.redundancy
+FROM ipam_ipaddress ip
+LEFT JOIN ipam_vrf vrf ON vrf.id = ip.vrf_id
+LEFT JOIN django_content_type ct ON ct.id = ip.assigned_object_type_id
+LEFT JOIN dcim_interface interface
+    ON ct.app_label = 'dcim' AND ct.model = 'interface' AND interface.id = ip.assigned_object_id
+LEFT JOIN dcim_device device ON device.id = interface.device_id
+LEFT JOIN virtualization_vminterface vminterface
+    ON ct.app_label = 'virtualization' AND ct.model = 'vminterface' AND vminterface.id = ip.assigned_object_id
+LEFT JOIN virtualization_virtualmachine vm ON vm.id = vminterface.virtual_machine_id
+LEFT JOIN gestion_impacts_impact impact ON impact.ip_address_id = ip.id
+WHERE ip.status = 'active'
+    AND (
+        ip.assigned_object_id IS NULL
+        OR (ct.app_label = 'dcim' AND ct.model = 'interface')
+        OR (ct.app_label = 'virtualization' AND ct.model = 'vminterface')
+    )
+ORDER BY ip.id, impact.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('dcim', '0185_gfk_indexes'),
+        ('gestion_impacts', '0006_delete_viewimpactipaddress'),
+        ('ipam', '0069_gfk_indexes'),
+        ('virtualization', '0038_virtualdisk'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImpactInventory',
+            fields=[
+                ('ip_address', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='impact_inventory', serialize=False, to='ipam.ipaddress')),
+                ('vrf_name', models.CharField(blank=True, max_length=100, null=True)),
+                ('assigned_to', models.TextField(db_index=True)),
+                ('impact_id', models.BigIntegerField(blank=True, db_index=True, null=True)),
+                ('impact', models.TextField(blank=True, null=True)),
+                ('redundancy', models.BooleanField(null=True)),
+            ],
+        ),
+        migrations.RunSQL(POPULATE_INVENTORY, migrations.RunSQL.noop),
+    ]
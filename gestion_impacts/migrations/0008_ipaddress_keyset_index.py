@@ -0,0 +1,21 @@
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction; building the index concurrently avoids locking
+    # ipam_ipaddress against writes on large databases
+    atomic = False
+
+    dependencies = [
+        ('gestion_impacts', '0007_impactinventory'),
+        ('ipam', '0069_gfk_indexes'),
+    ]
+
+    operations = [
+        # Composite index matching the (vrf, address, pk) keyset ordering of the impact list
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS gestion_impacts_ipaddress_keyset '
+            'ON ipam_ipaddress ((COALESCE(vrf_id, 0)), address, id)',
+            'DROP INDEX CONCURRENTLY IF EXISTS gestion_impacts_ipaddress_keyset',
+        ),
+    ]
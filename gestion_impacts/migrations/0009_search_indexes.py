@@ -0,0 +1,51 @@
+import django.contrib.postgres.indexes
+import django.db.models.functions.text
+from django.contrib.postgres.operations import TrigramExtension
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # The index on ipam_ipaddress is built CONCURRENTLY, which cannot run in a transaction
+    atomic = False
+
+    dependencies = [
+        ('gestion_impacts', '0008_ipaddress_keyset_index'),
+        ('ipam', '0069_gfk_indexes'),
+    ]
+
+    operations = [
+        TrigramExtension(),
+        migrations.AddIndex(
+            model_name='impact',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('impact'), name='gin_trgm_ops'
+                ),
+                name='gestion_impacts_impact_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='impactinventory',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('impact'), name='gin_trgm_ops'
+                ),
+                name='impactinventory_impact_trgm',
+            ),
+        ),
+        migrations.AddIndex(
+            model_name='impactinventory',
+            index=django.contrib.postgres.indexes.GinIndex(
+                django.contrib.postgres.indexes.OpClass(
+                    django.db.models.functions.text.Upper('assigned_to'), name='gin_trgm_ops'
+                ),
+                name='impactinventory_assigned_trgm',
+            ),
+        ),
+        # Trigram index on the host part of IP addresses, serving exact and partial address searches
+        migrations.RunSQL(
+            'CREATE INDEX CONCURRENTLY IF NOT EXISTS gestion_impacts_ipaddress_host_trgm '
+            'ON ipam_ipaddress USING gin (HOST(address) gin_trgm_ops)',
+            'DROP INDEX CONCURRENTLY IF EXISTS gestion_impacts_ipaddress_host_trgm',
+        ),
+    ]
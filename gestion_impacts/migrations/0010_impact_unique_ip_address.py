@@ -0,0 +1,47 @@
+from django.db import migrations, models
+
+# Keep the oldest Impact of each IP address, which is the one the list and the bulk edit already used
+DELETE_DUPLICATES = """
+WITH duplicates AS (
+    SELECT id FROM (
+        SELECT id, row_number() OVER (PARTITION BY ip_address_id ORDER BY id) AS position
+        FROM gestion_impacts_impact
+        WHERE ip_address_id IS NOT NULL
+    ) impacts
+    WHERE position > 1
+),
+deleted_tags AS (
+    DELETE FROM extras_taggeditem
+    WHERE object_id IN (SELECT id FROM duplicates)
+        AND content_type_id = (
+            SELECT id FROM django_content_type WHERE app_label = 'gestion_impacts' AND model = 'impact'
+        )
+)
+DELETE FROM gestion_impacts_impact WHERE id IN (SELECT id FROM duplicates)
+"""
+
+SYNC_INVENTORY = """
+UPDATE gestion_impacts_impactinventory inventory
+SET impact_id = impact.id, impact = impact.impact, redundancy = impact.redundancy
+FROM gestion_impacts_impact impact
+WHERE impact.ip_address_id = inventory.ip_address_id
+    AND inventory.impact_id IS DISTINCT FROM impact.id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('gestion_impacts', '0009_search_indexes'),
+    ]
+
+    operations = [
+        migrations.RunSQL(DELETE_DUPLICATES, migrations.RunSQL.noop),
+        migrations.RunSQL(SYNC_INVENTORY, migrations.RunSQL.noop),
+        migrations.AddConstraint(
+            model_name='impact',
+            constraint=models.UniqueConstraint(
+                fields=('ip_address',), include=('redundancy',), name='gestion_impacts_impact_unique_ip_address'
+            ),
+        ),
+    ]
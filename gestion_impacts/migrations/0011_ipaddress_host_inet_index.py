@@ -0,0 +1,35 @@
+from django.db import migrations
+
+# SP-GiST inet_ops requires PostgreSQL 14; GiST inet_ops serves the same operators on older servers
+MIN_SPGIST_VERSION = 140000
+
+CREATE_INDEX = (
+    'CREATE INDEX CONCURRENTLY IF NOT EXISTS gestion_impacts_ipaddress_host_inet '
+    'ON ipam_ipaddress USING {method} ((CAST(HOST(address) AS INET)) inet_ops)'
+)
+
+
+def create_index(apps, schema_editor):
+    method = 'spgist' if schema_editor.connection.pg_version >= MIN_SPGIST_VERSION else 'gist'
+    schema_editor.execute(CREATE_INDEX.format(method=method))
+
+
+def drop_index(apps, schema_editor):
+    schema_editor.execute('DROP INDEX CONCURRENTLY IF EXISTS gestion_impacts_ipaddress_host_inet')
+
+
+class Migration(migrations.Migration):
+    # CREATE INDEX CONCURRENTLY cannot run in a transaction; building the index concurrently avoids locking
+    # ipam_ipaddress against writes on large databases
+    atomic = False
+
+    dependencies = [
+        ('gestion_impacts', '0010_impact_unique_ip_address'),
+        ('ipam', '0069_gfk_indexes'),
+    ]
+
+    operations = [
+        # Index serving the CAST(HOST(address) AS INET) <<= prefix lookups (net_host_contained) of the parent and
+        # prefix filters
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,95 @@
+from django.db import migrations, models
+
+POPULATE_COVERAGE_FIELDS = """
+UPDATE gestion_impacts_impactinventory inventory
+SET
+    vrf_pk = ip.vrf_id,
+    site_pk = COALESCE(device.site_id, vm.site_id),
+    tenant_pk = COALESCE(ip.tenant_id, device.tenant_id, vm.tenant_id),
+    role_pk = COALESCE(device.role_id, vm.role_id)
+FROM ipam_ipaddress ip
+LEFT JOIN django_content_type ct ON ct.id = ip.assigned_object_type_id
+LEFT JOIN dcim_interface interface
+    ON ct.app_label = 'dcim' AND ct.model = 'interface' AND interface.id = ip.assigned_object_id
+LEFT JOIN dcim_device device ON device.id = interface.device_id
+LEFT JOIN virtualization_vminterface vminterface
+    ON ct.app_label = 'virtualization' AND ct.model = 'vminterface' AND vminterface.id = ip.assigned_object_id
+LEFT JOIN virtualization_virtualmachine vm ON vm.id = vminterface.virtual_machine_id
+WHERE ip.id = inventory.ip_address_id
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('dcim', '0185_gfk_indexes'),
+        ('gestion_impacts', '0011_ipaddress_host_inet_index'),
+        ('ipam', '0069_gfk_indexes'),
+        ('tenancy', '0015_contactassignment_rename_content_type'),
+        ('virtualization', '0038_virtualdisk'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='impactinventory',
+            name='vrf_pk',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='impactinventory',
+            name='site_pk',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='impactinventory',
+            name='tenant_pk',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='impactinventory',
+            name='role_pk',
+            field=models.BigIntegerField(blank=True, null=True),
+        ),
+        migrations.RunSQL(POPULATE_COVERAGE_FIELDS, migrations.RunSQL.noop),
+        migrations.AddIndex(
+            model_name='impactinventory',
+            index=models.Index(fields=['vrf_pk'], name='impactinventory_vrf_pk'),
+        ),
+        migrations.AddIndex(
+            model_name='impactinventory',
+            index=models.Index(fields=['site_pk'], name='impactinventory_site_pk'),
+        ),
+        migrations.AddIndex(
+            model_name='impactinventory',
+            index=models.Index(fields=['tenant_pk'], name='impactinventory_tenant_pk'),
+        ),
+        migrations.AddIndex(
+            model_name='impactinventory',
+            index=models.Index(fields=['role_pk'], name='impactinventory_role_pk'),
+        ),
+        migrations.CreateModel(
+            name='ImpactCoverage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('dimension', models.CharField(max_length=10)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+                ('ip_addresses', models.PositiveIntegerField(default=0)),
+                ('impacts', models.PositiveIntegerField(default=0)),
+                ('non_redundant', models.PositiveIntegerField(default=0)),
+                ('last_updated', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'indexes': [
+                    models.Index(fields=['dimension', 'object_id'], name='gestion_impacts_coverage_group'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='ImpactCoverageChange',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False)),
+                ('dimension', models.CharField(max_length=10)),
+                ('object_id', models.BigIntegerField(blank=True, null=True)),
+            ],
+        ),
+    ]
@@ -1,4 +1,6 @@
+from django.contrib.postgres.indexes import GinIndex, OpClass
 from django.db import models
+from django.db.models.functions import Upper
 from django.urls import reverse
 from django.conf import settings
 
@@ -12,6 +14,18 @@ class Impact(NetBoxModel):
                                    related_name='ipaddress')
     vrf = models.ForeignKey('ipam.VRF', on_delete=models.CASCADE, null=True, blank=True)
 
+    class Meta:
+        constraints = [
+            # One Impact per IP address; bulk writes upsert against it (ON CONFLICT)
+            models.UniqueConstraint(
+                fields=('ip_address',), include=('redundancy',), name='gestion_impacts_impact_unique_ip_address'
+            ),
+        ]
+        indexes = [
+            # Trigram index serving icontains lookups, which compare UPPER(impact)
+            GinIndex(OpClass(Upper('impact'), name='gin_trgm_ops'), name='gestion_impacts_impact_trgm'),
+        ]
+
     def __str__(self):
         return f""
 
@@ -19,3 +33,67 @@ class Impact(NetBoxModel):
         return reverse('plugins:gestion_impacts:impact', args=[self.pk])
 
 
+class ImpactInventory(models.Model):
+    """
+    Denormalized projection of the impact list: one row per active IP address, maintained by the handlers in
+    signals.py and rebuilt by the rebuild_impact_inventory management command.
+    """
+    ip_address = models.OneToOneField('ipam.IPAddress', on_delete=models.CASCADE, primary_key=True,
+                                      related_name='impact_inventory')
+    vrf_name = models.CharField(max_length=100, null=True, blank=True)
+    assigned_to = models.TextField(db_index=True)
+    impact_id = models.BigIntegerField(null=True, blank=True, db_index=True)
+    impact = models.TextField(null=True, blank=True)
+    redundancy = models.BooleanField(null=True)
+    # Groups of the coverage report (see coverage.py)
+    vrf_pk = models.BigIntegerField(null=True, blank=True)
+    site_pk = models.BigIntegerField(null=True, blank=True)
+    tenant_pk = models.BigIntegerField(null=True, blank=True)
+    role_pk = models.BigIntegerField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Trigram indexes used by the quick search (see ImpactFilterSet.search)
+            GinIndex(OpClass(Upper('impact'), name='gin_trgm_ops'), name='impactinventory_impact_trgm'),
+            GinIndex(OpClass(Upper('assigned_to'), name='gin_trgm_ops'), name='impactinventory_assigned_trgm'),
+            # Coverage groups recomputed by refresh_coverage()
+            models.Index(fields=('vrf_pk',), name='impactinventory_vrf_pk'),
+            models.Index(fields=('site_pk',), name='impactinventory_site_pk'),
+            models.Index(fields=('tenant_pk',), name='impactinventory_tenant_pk'),
+            models.Index(fields=('role_pk',), name='impactinventory_role_pk'),
+        ]
+
+    def __str__(self):
+        return f"{self.ip_address_id} ({self.assigned_to})"
+
+
+class ImpactCoverage(models.Model):
+    """
+    Impact coverage of the inventory grouped by VRF, site, tenant or device role, refreshed by refresh_coverage()
+    for the groups recorded in ImpactCoverageChange. A null object_id groups the IP addresses without such object.
+    """
+    dimension = models.CharField(max_length=10)
+    object_id = models.BigIntegerField(null=True, blank=True)
+    ip_addresses = models.PositiveIntegerField(default=0)
+    impacts = models.PositiveIntegerField(default=0)
+    non_redundant = models.PositiveIntegerField(default=0)
+    last_updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=('dimension', 'object_id'), name='gestion_impacts_coverage_group'),
+        ]
+
+    def __str__(self):
+        return f"{self.dimension} {self.object_id}"
+
+
+class ImpactCoverageChange(models.Model):
+    """
+    Coverage group whose counts are outdated, recorded along with every inventory write.
+    """
+    dimension = models.CharField(max_length=10)
+    object_id = models.BigIntegerField(null=True, blank=True)
+
+    def __str__(self):
+        return f"{self.dimension} {self.object_id}"
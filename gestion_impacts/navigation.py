@@ -6,22 +6,32 @@ gestion_impacts_button = PluginMenuButton(
     icon_class='mdi mdi-plus-thick',
 )
 
-# gestion_impacts_import_button = PluginMenuButton(
-#     link='plugins:gestion_impacts:impact_import',
-#     title='Importer des impacts',
-#     icon_class='mdi mdi-upload',
-# )
+gestion_impacts_import_button = PluginMenuButton(
+    link='plugins:gestion_impacts:impact_import',
+    title='Importer des impacts',
+    icon_class='mdi mdi-upload',
+)
 
 menu_impacts = PluginMenuItem(
     link='plugins:gestion_impacts:impact_list',
     link_text='Impacts',
-    buttons=(gestion_impacts_button,),
+    buttons=(gestion_impacts_button, gestion_impacts_import_button),
+)
+
+menu_blast_radius = PluginMenuItem(
+    link='plugins:gestion_impacts:impact_blast_radius',
+    link_text="Analyse d'impact",
+)
+
+menu_coverage = PluginMenuItem(
+    link='plugins:gestion_impacts:impact_coverage',
+    link_text='Couverture',
 )
 
 menu = PluginMenu(
     label='Gestion des impacts',
     groups=(
-        ('', (menu_impacts,)),
+        ('', (menu_impacts, menu_blast_radius, menu_coverage)),
     ),
     icon_class='mdi mdi-alert'
 )
@@ -0,0 +1,174 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import BigIntegerField, BooleanField, Expression, F, Value
+from django.db.models.functions import Coalesce
+from netbox.plugins.utils import get_plugin_config
+
+# Below this planner estimate, the exact count is cheap enough to be computed
+EXACT_COUNT_THRESHOLD = 1000
+
+
+class RowComparison(Expression):
+    """
+    SQL row-value comparison, e.g. (a, b, c) > (1, '10.0.0.1/24', 42), which Postgres can resolve with a single
+    index range scan on a matching composite index.
+    """
+    conditional = True
+    output_field = BooleanField()
+
+    def __init__(self, expressions, values, operator='>', output_fields=None):
+        super().__init__()
+        self.expressions = [F(e) if isinstance(e, str) else e for e in expressions]
+        output_fields = output_fields or [None] * len(values)
+        self.values = [Value(v, output_field=field) for v, field in zip(values, output_fields)]
+        self.operator = operator
+
+    def get_source_expressions(self):
+        return [*self.expressions, *self.values]
+
+    def set_source_expressions(self, exprs):
+        self.expressions, self.values = exprs[:len(self.expressions)], exprs[len(self.expressions):]
+
+    def as_sql(self, compiler, connection):
+        params = []
+        sides = []
+        for side in (self.expressions, self.values):
+            sql_parts = []
+            for expression in side:
+                sql, expression_params = compiler.compile(expression)
+                sql_parts.append(sql)
+                params.extend(expression_params)
+            sides.append(', '.join(sql_parts))
+        return f'({sides[0]}) {self.operator} ({sides[1]})', params
+
+
+def encode_cursor(values, reverse=False):
+    payload = json.dumps({'k': [str(v) if v is not None else None for v in values], 'r': reverse})
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+
+def decode_cursor(cursor):
+    """
+    Return the (values, reverse) tuple encoded in a cursor, or None if the cursor is empty or invalid.
+    """
+    if not cursor:
+        return None
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return payload['k'], bool(payload['r'])
+    except (binascii.Error, ValueError, KeyError, TypeError):
+        return None
+
+
+def estimate_count(queryset):
+    """
+    Return a (count, exact) tuple: the planner's row estimate for the queryset, or its exact count when the
+    estimate is small.
+    """
+    try:
+        plan = json.loads(queryset.explain(format='json'))
+        estimate = int(plan[0]['Plan']['Plan Rows'])
+    except (ValueError, KeyError, IndexError, TypeError):
+        return queryset.count(), True
+    if estimate < EXACT_COUNT_THRESHOLD:
+        return queryset.count(), True
+    return estimate, False
+
+
+class KeysetPage:
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+
+class KeysetPaginator:
+    """
+    Paginate a queryset by seeking past the last row of the previous page instead of using OFFSET. `keys` maps
+    annotation names to the expressions of a unique ordering; the last key must be unique on its own (e.g. the pk).
+    """
+
+    def __init__(self, queryset, keys, per_page):
+        self.keys = keys
+        self.per_page = per_page
+        self.queryset = queryset.annotate(**keys)
+
+    def get_key_values(self, obj):
+        return [getattr(obj, name) for name in self.keys]
+
+    def get_key_fields(self):
+        return [self.queryset.query.annotations[name].output_field for name in self.keys]
+
+    def get_position(self, cursor):
+        """
+        Decode a cursor into the (values, reverse) position it encodes, each value converted to the type of its
+        key. Returns None, i.e. the first page, for an empty cursor or one which does not match the keys.
+        """
+        if (position := decode_cursor(cursor)) is None:
+            return None
+        values, backwards = position
+        if not isinstance(values, list) or len(values) != len(self.keys) or any(v in (None, '') for v in values):
+            return None
+        try:
+            values = [field.to_python(value) for field, value in zip(self.get_key_fields(), values)]
+        except (ValidationError, ValueError, TypeError):
+            return None
+        return values, backwards
+
+    def get_page(self, cursor=None):
+        position = self.get_position(cursor)
+        names = list(self.keys)
+
+        if position is None:
+            rows = list(self.queryset.order_by(*names)[:self.per_page + 1])
+            has_more, has_previous = len(rows) > self.per_page, False
+            rows = rows[:self.per_page]
+        else:
+            values, backwards = position
+            operator, ordering = ('<', [f'-{name}' for name in names]) if backwards else ('>', names)
+            comparison = RowComparison(names, values, operator, output_fields=self.get_key_fields())
+            queryset = self.queryset.filter(comparison).order_by(*ordering)
+            rows = list(queryset[:self.per_page + 1])
+            has_more, has_previous = len(rows) > self.per_page, True
+            rows = rows[:self.per_page]
+            if backwards:
+                rows.reverse()
+                # Seeking backwards, the extra row tells whether there is a previous page
+                has_more, has_previous = True, has_more
+
+        return KeysetPage(
+            rows,
+            next_cursor=encode_cursor(self.get_key_values(rows[-1])) if rows and has_more else None,
+            previous_cursor=encode_cursor(self.get_key_values(rows[0]), reverse=True) if rows and has_previous else None,
+        )
+
+
+def get_ip_address_keys():
+    # (vrf, address, pk), matching the gestion_impacts_ipaddress_keyset index created by migration 0008
+    return {
+        'keyset_vrf': Coalesce(F('vrf_id'), Value(0), output_field=BigIntegerField()),
+        'keyset_address': F('address'),
+        'keyset_pk': F('pk'),
+    }
+
+
+def keyset_pagination_enabled(params):
+    return 'cursor' in params or get_plugin_config('gestion_impacts', 'keyset_pagination')
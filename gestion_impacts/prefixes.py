@@ -0,0 +1,53 @@
+from django.db import connection
+from ipam.models import Prefix
+
+# Inventoried IP addresses, impacts and non-redundant impacts of each prefix, in its VRF
+PREFIX_COUNTS = """
+SELECT
+    prefix.id,
+    COUNT(inventory.ip_address_id),
+    COUNT(inventory.impact_id),
+    COUNT(inventory.impact_id) FILTER (WHERE NOT inventory.redundancy)
+FROM ipam_prefix prefix
+LEFT JOIN ipam_ipaddress ip
+    ON CAST(HOST(ip.address) AS INET) <<= prefix.prefix AND ip.vrf_id IS NOT DISTINCT FROM prefix.vrf_id
+LEFT JOIN gestion_impacts_impactinventory inventory ON inventory.ip_address_id = ip.id
+WHERE prefix.id = ANY(%s)
+GROUP BY prefix.id
+"""
+
+
+def get_prefix_counts(prefixes):
+    """
+    Return a dict mapping the pk of each given prefix to its (IP addresses, impacts, non-redundant impacts) counts,
+    in a single query.
+    """
+    with connection.cursor() as cursor:
+        cursor.execute(PREFIX_COUNTS, [[prefix.pk for prefix in prefixes]])
+        return {pk: counts for pk, *counts in cursor.fetchall()}
+
+
+def get_child_prefix_summary(prefix):
+    """
+    Summarize the impacts of a prefix and of each of its direct child prefixes.
+    """
+    children = list(Prefix.objects.filter(
+        vrf=prefix.vrf, prefix__net_contained=str(prefix.prefix), _depth=prefix._depth + 1
+    ).order_by('prefix'))
+    counts = get_prefix_counts([prefix, *children])
+
+    def summary(obj):
+        ip_addresses, impacts, non_redundant = counts.get(obj.pk, (0, 0, 0))
+        return {
+            'id': obj.pk,
+            'prefix': str(obj.prefix),
+            'vrf': obj.vrf.name if obj.vrf else None,
+            'ip_addresses': ip_addresses,
+            'impacts': impacts,
+            'non_redundant': non_redundant,
+        }
+
+    return {
+        **summary(prefix),
+        'children': [summary(child) for child in children],
+    }
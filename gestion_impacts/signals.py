@@ -0,0 +1,87 @@
+from contextvars import ContextVar
+
+from dcim.models import Device, Interface
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from ipam.models import IPAddress, VRF
+from virtualization.models import VirtualMachine, VMInterface
+
+from .cache import invalidate_counts, invalidate_vrf_choices
+from .coverage import COVERAGE_FIELDS, mark_coverage_changes
+from .inventory import refresh_inventory
+from .models import Impact, ImpactInventory
+
+# IP addresses being deleted, between their pre_delete and post_delete signals
+deleted_ip_addresses = ContextVar('deleted_ip_addresses', default=frozenset())
+
+
+#
+# Impact inventory maintenance
+#
+
+@receiver((post_save, post_delete), sender=Impact)
+def update_inventory_for_impact(instance, **kwargs):
+    # An Impact deleted along with its IP address must not write the inventory row back: the cascade may already
+    # have deleted it, and the row would then violate its foreign key once the IP address is gone
+    if instance.ip_address_id and instance.ip_address_id not in deleted_ip_addresses.get():
+        refresh_inventory([instance.ip_address_id])
+
+
+@receiver(post_save, sender=IPAddress)
+def update_inventory_for_ip_address(instance, **kwargs):
+    # Deleted IP addresses are removed from the inventory by the cascade on ImpactInventory.ip_address
+    refresh_inventory([instance.pk])
+
+
+@receiver(pre_delete, sender=IPAddress)
+def update_coverage_for_ip_address(instance, **kwargs):
+    deleted_ip_addresses.set(deleted_ip_addresses.get() | {instance.pk})
+    # The inventory row is about to be deleted by the cascade: its coverage groups lose an IP address
+    mark_coverage_changes(
+        ImpactInventory.objects.filter(ip_address=instance.pk).values_list(*COVERAGE_FIELDS)
+    )
+
+
+@receiver(post_delete, sender=IPAddress)
+def forget_deleted_ip_address(instance, **kwargs):
+    deleted_ip_addresses.set(deleted_ip_addresses.get() - {instance.pk})
+
+
+@receiver(post_save, sender=Interface)
+@receiver(post_save, sender=VMInterface)
+def update_inventory_for_interface(instance, **kwargs):
+    refresh_inventory(instance.ip_addresses.values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=Device)
+def update_inventory_for_device(instance, **kwargs):
+    refresh_inventory(IPAddress.objects.filter(interface__device=instance).values_list('pk', flat=True))
+
+
+@receiver(post_save, sender=VirtualMachine)
+def update_inventory_for_virtual_machine(instance, **kwargs):
+    refresh_inventory(
+        IPAddress.objects.filter(vminterface__virtual_machine=instance).values_list('pk', flat=True)
+    )
+
+
+@receiver(post_save, sender=VRF)
+def update_inventory_for_vrf(instance, **kwargs):
+    ImpactInventory.objects.filter(ip_address__vrf=instance).update(vrf_name=instance.name)
+
+
+#
+# Cache invalidation (inventory writes retire the list counts themselves, see write_inventory_rows)
+#
+
+@receiver(post_delete, sender=Impact)
+@receiver(post_delete, sender=IPAddress)
+def invalidate_list_counts(**kwargs):
+    transaction.on_commit(invalidate_counts)
+
+
+@receiver((post_save, post_delete), sender=VRF)
+def invalidate_vrf_cache(**kwargs):
+    transaction.on_commit(invalidate_vrf_choices)
+    transaction.on_commit(invalidate_counts)
@@ -0,0 +1,164 @@
+import logging
+import time
+from contextlib import contextmanager
+
+from django.core.cache import cache
+from django.db import DatabaseError, connection, transaction
+from django.utils import timezone
+from netbox.plugins.utils import get_plugin_config
+
+from .cache import CACHE_PREFIX
+
+logger = logging.getLogger(__name__)
+
+SLOW_QUERIES_KEY = f'{CACHE_PREFIX}:slow_queries'
+# Number of recorded requests, whose remainder by slow_query_buffer_size gives the ring buffer slot of the next one
+SLOW_QUERIES_COUNTER_KEY = f'{SLOW_QUERIES_KEY}:counter'
+
+# Only the slowest queries of a slow request are explained
+MAX_EXPLAINED_QUERIES = 5
+# Queries recorded per request; the remaining ones are only counted
+MAX_CAPTURED_QUERIES = 500
+MAX_PARAMS_LENGTH = 1000
+
+
+class QueryCapture:
+    """
+    Database execute wrapper recording the SQL, parameters and duration of every query of a request.
+    """
+
+    def __init__(self):
+        self.queries = []
+        self.count = 0
+        self.total_time = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - start
+            self.count += 1
+            self.total_time += duration
+            if not many and len(self.queries) < MAX_CAPTURED_QUERIES:
+                self.queries.append((sql, params, duration))
+
+
+def explain_query(sql, params):
+    """
+    Return the EXPLAIN output of a SELECT query. The query is only planned, not executed again, so explaining adds
+    no more than the planning time to the request. It runs in a savepoint so that a failure does not break an
+    enclosing transaction.
+    """
+    try:
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                cursor.execute(f'EXPLAIN {sql}', params)
+                plan = '\n'.join(row[0] for row in cursor.fetchall())
+    except DatabaseError as e:
+        plan = f'EXPLAIN failed: {e}'
+    return plan
+
+
+def is_explainable(sql):
+    return sql.lstrip().upper().startswith('SELECT')
+
+
+def get_slot_keys():
+    size = get_plugin_config('gestion_impacts', 'slow_query_buffer_size')
+    return [f'{SLOW_QUERIES_KEY}:{slot}' for slot in range(size)]
+
+
+def push_slow_request(entry):
+    """
+    Store an entry in the ring buffer. The slot is taken from an atomic counter, so concurrent requests never
+    overwrite each other's entries (the oldest one of a full buffer is replaced).
+    """
+    slot_keys = get_slot_keys()
+    if not slot_keys:
+        return
+    cache.add(SLOW_QUERIES_COUNTER_KEY, 0, None)
+    try:
+        count = cache.incr(SLOW_QUERIES_COUNTER_KEY)
+    except ValueError:
+        # Evicted between add() and incr()
+        count = 1
+        cache.set(SLOW_QUERIES_COUNTER_KEY, count, None)
+    cache.set(slot_keys[(count - 1) % len(slot_keys)], entry, None)
+
+
+def record_slow_request(request, view, capture, duration):
+    explained = sorted(
+        (query for query in capture.queries if is_explainable(query[0])), key=lambda query: query[2], reverse=True
+    )[:MAX_EXPLAINED_QUERIES]
+    entry = {
+        'time': timezone.now(),
+        'view': view,
+        'path': request.path,
+        'user': getattr(request.user, 'username', ''),
+        'params': [(name, value) for name, values in request.GET.lists() for value in values],
+        'duration': duration,
+        'query_time': capture.total_time,
+        'query_count': capture.count,
+        'queries': [
+            {
+                'sql': sql,
+                'params': repr(params)[:MAX_PARAMS_LENGTH],
+                'duration': query_time,
+                'plan': explain_query(sql, params),
+            }
+            for sql, params, query_time in explained
+        ],
+    }
+
+    push_slow_request(entry)
+    logger.info(
+        f"Slow {view} request: {capture.total_time * 1000:.0f} ms in {capture.count} queries ({request.get_full_path()})"
+    )
+
+
+def get_slow_requests():
+    """
+    Return the entries of the ring buffer, the most recent first.
+    """
+    entries = cache.get_many(get_slot_keys()).values()
+    return sorted(entries, key=lambda entry: entry['time'], reverse=True)
+
+
+def clear_slow_requests():
+    cache.delete_many([*get_slot_keys(), SLOW_QUERIES_COUNTER_KEY])
+
+
+@contextmanager
+def capture_slow_queries(request, view):
+    """
+    Record the enclosed block's queries and, when their total time exceeds the slow_query_threshold setting
+    (milliseconds), store the request in the ring buffer along with the EXPLAIN plans of its slowest queries.
+    """
+    threshold = get_plugin_config('gestion_impacts', 'slow_query_threshold')
+    if threshold is None:
+        yield
+        return
+
+    capture = QueryCapture()
+    start = time.perf_counter()
+    with connection.execute_wrapper(capture):
+        yield
+    duration = time.perf_counter() - start
+
+    if capture.total_time * 1000 >= threshold:
+        try:
+            record_slow_request(request, view, capture, duration)
+        except Exception:
+            # Diagnostics must never break the request they observe
+            logger.exception(f"Unable to record a slow {view} request")
+
+
+class SlowQueryCaptureMixin:
+    """
+    Capture the slow requests of the view (see capture_slow_queries).
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        with capture_slow_queries(request, self.__class__.__name__):
+            return super().dispatch(request, *args, **kwargs)
@@ -1,11 +1,25 @@
 import django_tables2 as tables
 from django.utils.translation import gettext_lazy as _
+from django_tables2.data import TableQuerysetData
 from ipam.models import IPAddress
 from netbox.tables import NetBoxTable
 
 from gestion_impacts.custom import CustomActionsColumn
 
 
+class CountedTableData(TableQuerysetData):
+    """
+    Queryset table data whose row count is already known (e.g. cached), which spares the paginator's COUNT query.
+    """
+
+    def __init__(self, data, count):
+        super().__init__(data)
+        self.count = count
+
+    def __len__(self):
+        return self.count
+
+
 class ImpactTable(NetBoxTable):
     ip_address = tables.Column(accessor='ip_address', verbose_name=_('IP Address'), linkify=True)
     vrf_name = tables.Column(accessor='vrf_name', verbose_name='VRF')
@@ -0,0 +1,58 @@
+from ipam.models import IPAddress
+from netbox.plugins import PluginTemplateExtension
+
+from .blast_radius import get_blast_radius_rows
+from .models import Impact
+
+
+class ImpactPanelMixin:
+
+    def has_permission(self):
+        return self.context['request'].user.has_perm('gestion_impacts.view_impact')
+
+
+class IPAddressImpactPanel(ImpactPanelMixin, PluginTemplateExtension):
+    model = 'ipam.ipaddress'
+
+    def right_page(self):
+        if not self.has_permission():
+            return ''
+        obj = self.context['object']
+        user = self.context['request'].user
+        return self.render('gestion_impacts/inc/ipaddress_impact_panel.html', extra_context={
+            'impact': Impact.objects.restrict(user, 'view').filter(ip_address=obj).first(),
+            'can_add': user.has_perm('gestion_impacts.add_impact'),
+            'can_change': user.has_perm('gestion_impacts.change_impact'),
+        })
+
+
+class AssignedImpactsPanel(ImpactPanelMixin, PluginTemplateExtension):
+    """
+    Impacts of all the IP addresses assigned to the interfaces of a device or virtual machine, fetched in a single
+    query (see get_blast_radius_rows).
+    """
+    scope_name = None
+
+    def full_width_page(self):
+        if not self.has_permission():
+            return ''
+        obj = self.context['object']
+        rows = get_blast_radius_rows(
+            {self.scope_name: [obj.pk]}, IPAddress.objects.restrict(self.context['request'].user, 'view')
+        )
+        return self.render('gestion_impacts/inc/assigned_impacts_panel.html', extra_context={
+            'rows': rows,
+        })
+
+
+class DeviceImpactsPanel(AssignedImpactsPanel):
+    model = 'dcim.device'
+    scope_name = 'device_id'
+
+
+class VirtualMachineImpactsPanel(AssignedImpactsPanel):
+    model = 'virtualization.virtualmachine'
+    scope_name = 'virtual_machine_id'
+
+
+template_extensions = [IPAddressImpactPanel, DeviceImpactsPanel, VirtualMachineImpactsPanel]
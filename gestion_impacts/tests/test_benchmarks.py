@@ -0,0 +1,66 @@
+import uuid
+
+from dcim.models import Device, Interface
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.contenttypes.models import ContentType
+from django.test import RequestFactory, TestCase
+from extras.choices import ObjectChangeActionChoices
+from extras.models import ObjectChange, Tag, TaggedItem
+from ipam.models import IPAddress
+from virtualization.models import VMInterface
+
+from gestion_impacts.benchmarks import delete_dataset, measure
+from gestion_impacts.cache import get_cached_count
+from gestion_impacts.models import Impact
+
+from .utils import create_dataset
+
+
+class DeleteDatasetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def test_delete_dataset(self):
+        tag = Tag.objects.create(name='Tag', slug='tag')
+        ip_address = IPAddress.objects.filter(impact_inventory__impact_id__isnull=False).first()
+        ip_address.tags.add(tag)
+        Impact.objects.get(ip_address=ip_address).tags.add(tag)
+        nat_outside = IPAddress.objects.create(address='192.0.2.1/24', nat_inside=ip_address)
+        primary_ip = IPAddress.objects.filter(assigned_object_type=ContentType.objects.get_for_model(Interface)).first()
+        Device.objects.filter(pk=primary_ip.assigned_object.device_id).update(primary_ip4=primary_ip)
+        change = ObjectChange.objects.create(
+            changed_object=ip_address, object_repr=str(ip_address), action=ObjectChangeActionChoices.ACTION_UPDATE,
+            request_id=uuid.uuid4(), user_name='test',
+        )
+
+        delete_dataset(log=lambda message: None)
+
+        self.assertFalse(IPAddress.objects.exclude(pk=nat_outside.pk).exists())
+        self.assertFalse(Impact.objects.exists())
+        self.assertFalse(Interface.objects.exists())
+        self.assertFalse(VMInterface.objects.exists())
+        self.assertFalse(TaggedItem.objects.filter(tag=tag).exists())
+        nat_outside.refresh_from_db()
+        self.assertIsNone(nat_outside.nat_inside)
+        # The change log is kept
+        self.assertTrue(ObjectChange.objects.filter(pk=change.pk).exists())
+
+
+class MeasureTestCase(TestCase):
+
+    def test_count_per_run(self):
+        # Every run pays for the list count, which the count cache would otherwise spare after the first one
+        request = RequestFactory().get('/plugins/gestion_impacts/impacts/')
+        request.user = AnonymousUser()
+        counts = []
+
+        def count():
+            counts.append(1)
+            return len(counts)
+
+        result = measure('count', lambda: get_cached_count(request, count), repeat=3)
+        self.assertEqual(len(counts), 3)
+        self.assertEqual(len(result['runs_ms']), 3)
+        self.assertEqual(result['cold_ms'], result['runs_ms'][0])
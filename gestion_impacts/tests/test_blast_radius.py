@@ -0,0 +1,68 @@
+from dcim.models import Device, Site
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from ipam.models import IPAddress
+from virtualization.models import VirtualMachine
+
+from gestion_impacts.blast_radius import get_blast_radius
+from gestion_impacts.models import ImpactInventory
+
+from .utils import create_dataset
+
+
+class BlastRadiusTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def test_empty_scope(self):
+        report = get_blast_radius({'device_id': [], 'site_id': []})
+        self.assertEqual((report['ip_addresses'], report['rows']), (0, []))
+
+    def test_device(self):
+        device = Device.objects.first()
+        expected = set(IPAddress.objects.filter(interface__device=device).values_list('pk', flat=True))
+        report = get_blast_radius({'device_id': [device.pk]})
+        self.assertTrue(expected)
+        self.assertEqual({row['ip_address_id'] for row in report['rows']}, expected)
+        self.assertEqual({row['assigned_to'] for row in report['rows']}, {device.name})
+
+    def test_counts(self):
+        devices = list(Device.objects.values_list('pk', flat=True)[:2])
+        virtual_machine = VirtualMachine.objects.first()
+        report = get_blast_radius({'device_id': devices, 'virtual_machine_id': [virtual_machine.pk]})
+        inventory = ImpactInventory.objects.filter(pk__in=[row['ip_address_id'] for row in report['rows']])
+
+        self.assertEqual(report['ip_addresses'], inventory.count())
+        self.assertEqual(report['impacts'], inventory.filter(impact_id__isnull=False).count())
+        self.assertEqual(report['non_redundant'], inventory.filter(impact_id__isnull=False, redundancy=False).count())
+        self.assertEqual(report['without_impact'], inventory.filter(impact_id__isnull=True).count())
+        self.assertEqual(sum(group['ip_addresses'] for group in report['by_vrf']), report['ip_addresses'])
+        self.assertEqual(
+            {group['name'] for group in report['by_assigned_to']},
+            {*Device.objects.filter(pk__in=devices).values_list('name', flat=True), virtual_machine.name},
+        )
+        # Non-redundant impacts first
+        ranks = [0 if row['impact_id'] and not row['redundancy'] else 1 for row in report['rows']]
+        self.assertEqual(ranks, sorted(ranks))
+
+    def test_site(self):
+        # The devices and the virtual machines of the site
+        site = Site.objects.first()
+        report = get_blast_radius({'site_id': [site.pk]})
+        self.assertEqual(report['ip_addresses'], IPAddress.objects.filter(assigned_object_id__isnull=False).count())
+
+    def test_restricted_ip_addresses(self):
+        device = Device.objects.first()
+        visible = IPAddress.objects.filter(interface__device=device).order_by('pk')[:1]
+        report = get_blast_radius({'device_id': [device.pk]}, IPAddress.objects.filter(pk__in=visible))
+        self.assertEqual([row['ip_address_id'] for row in report['rows']], [visible[0].pk])
+
+    def test_view(self):
+        device = Device.objects.first()
+        self.client.force_login(get_user_model().objects.create_user(username='superuser', is_superuser=True))
+        response = self.client.get(reverse('plugins:gestion_impacts:impact_blast_radius'), {'device_id': device.pk})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['report']['ip_addresses'], IPAddress.objects.filter(interface__device=device).count())
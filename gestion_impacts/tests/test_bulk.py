@@ -0,0 +1,47 @@
+from core.models import ObjectType
+from django.core.exceptions import ValidationError
+from django.test import TestCase
+from extras.choices import CustomFieldTypeChoices, ObjectChangeActionChoices
+from extras.models import CustomField, ObjectChange
+from ipam.models import IPAddress
+
+from gestion_impacts.bulk import bulk_edit_impacts
+from gestion_impacts.models import Impact
+
+
+class BulkEditImpactsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        IPAddress.objects.bulk_create([
+            IPAddress(address=f'192.0.2.{i}/24', status='active') for i in range(1, 4)
+        ])
+        custom_field = CustomField.objects.create(name='priority', type=CustomFieldTypeChoices.TYPE_INTEGER)
+        custom_field.object_types.set([ObjectType.objects.get_for_model(Impact)])
+
+    def test_created_and_updated(self):
+        ip_addresses = IPAddress.objects.order_by('pk')
+        existing = Impact.objects.create(ip_address=ip_addresses[0], impact='before')
+
+        created, updated = bulk_edit_impacts(ip_addresses, {'impact': 'after'})
+        self.assertEqual([impact.pk for impact in updated], [existing.pk])
+        self.assertEqual(len(created), 2)
+
+        actions = dict(
+            ObjectChange.objects.filter(changed_object_id__in=[existing.pk, *(impact.pk for impact in created)])
+            .values_list('changed_object_id', 'action')
+        )
+        self.assertEqual(actions.pop(existing.pk), ObjectChangeActionChoices.ACTION_UPDATE)
+        self.assertEqual(set(actions.values()), {ObjectChangeActionChoices.ACTION_CREATE})
+
+    def test_invalid_custom_field_on_update(self):
+        # Only existing Impacts are edited: the custom field values must be validated all the same
+        ip_address = IPAddress.objects.first()
+        Impact.objects.create(ip_address=ip_address, impact='before')
+        with self.assertRaises(ValidationError):
+            bulk_edit_impacts(IPAddress.objects.filter(pk=ip_address.pk), {}, {'priority': 'high'})
+        with self.assertRaises(ValidationError):
+            bulk_edit_impacts(IPAddress.objects.filter(pk=ip_address.pk), {}, {'unknown': 1})
+
+        bulk_edit_impacts(IPAddress.objects.filter(pk=ip_address.pk), {}, {'priority': 2})
+        self.assertEqual(Impact.objects.get().custom_field_data['priority'], 2)
@@ -0,0 +1,72 @@
+from django.test import TestCase
+from ipam.models import IPAddress, VRF
+
+from gestion_impacts.coverage import (
+    COVERAGE_DIMENSIONS, COVERAGE_FIELDS, get_group_filter, mark_coverage_changes, refresh_coverage,
+)
+from gestion_impacts.models import Impact, ImpactCoverage, ImpactCoverageChange, ImpactInventory
+
+from .utils import create_dataset, get_index_names, planner_settings
+
+
+class RefreshCoverageTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def get_counts(self):
+        return set(ImpactCoverage.objects.values_list('dimension', 'object_id', 'ip_addresses', 'impacts'))
+
+    def test_incremental_refresh(self):
+        refresh_coverage(full=True)
+        expected = self.get_counts()
+        ImpactCoverage.objects.filter(dimension='site').update(ip_addresses=0)
+        rows = list(ImpactInventory.objects.values_list(*COVERAGE_FIELDS))
+        mark_coverage_changes(rows)
+        refreshed = refresh_coverage()
+        self.assertEqual(refreshed['site'], len({row[1] for row in rows}))
+        self.assertEqual(self.get_counts(), expected)
+
+    def test_refresh_marked_groups_only(self):
+        refresh_coverage(full=True)
+        marked, unmarked = VRF.objects.order_by('pk')[:2]
+        expected = ImpactCoverage.objects.get(dimension='vrf', object_id=marked.pk).ip_addresses
+        ImpactCoverage.objects.filter(dimension='vrf').update(ip_addresses=0)
+        ImpactCoverageChange.objects.create(dimension='vrf', object_id=marked.pk)
+
+        self.assertEqual(refresh_coverage(), {'vrf': 1})
+        self.assertEqual(ImpactCoverage.objects.get(dimension='vrf', object_id=marked.pk).ip_addresses, expected)
+        self.assertEqual(ImpactCoverage.objects.get(dimension='vrf', object_id=unmarked.pk).ip_addresses, 0)
+        self.assertFalse(ImpactCoverageChange.objects.exists())
+
+    def test_ip_address_deletion(self):
+        refresh_coverage(full=True)
+        ip_address = IPAddress.objects.filter(impact_inventory__impact_id__isnull=False).first()
+        group = ImpactCoverage.objects.get(dimension='vrf', object_id=ip_address.vrf_id)
+        ip_address.delete()
+
+        refresh_coverage()
+        updated = ImpactCoverage.objects.get(dimension='vrf', object_id=group.object_id)
+        self.assertEqual((updated.ip_addresses, updated.impacts), (group.ip_addresses - 1, group.impacts - 1))
+
+    def test_inventory_write(self):
+        refresh_coverage(full=True)
+        ip_address = IPAddress.objects.filter(impact_inventory__impact_id__isnull=True).first()
+        group = ImpactCoverage.objects.get(dimension='vrf', object_id=ip_address.vrf_id)
+        Impact.objects.create(ip_address=ip_address, vrf=ip_address.vrf, impact='Messagerie')
+
+        refresh_coverage()
+        updated = ImpactCoverage.objects.get(dimension='vrf', object_id=group.object_id)
+        self.assertEqual((updated.ip_addresses, updated.impacts), (group.ip_addresses, group.impacts + 1))
+        # The incremental result matches a full recomputation
+        counts = self.get_counts()
+        refresh_coverage(full=True)
+        self.assertEqual(self.get_counts(), counts)
+
+    def test_group_filter_plan_uses_index(self):
+        # Seq scans are disabled so that the small test table shows which index each group filter can use
+        for field, _ in COVERAGE_DIMENSIONS.values():
+            with self.subTest(field=field), planner_settings(enable_seqscan='off'):
+                queryset = ImpactInventory.objects.filter(get_group_filter(field, {1, None}))
+                self.assertIn(f'impactinventory_{field}', get_index_names(queryset))
@@ -0,0 +1,98 @@
+import csv
+import io
+import json
+
+from dcim.models import DeviceType, Manufacturer
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from gestion_impacts.exports import export_yaml
+from gestion_impacts.models import ImpactInventory
+from gestion_impacts.tables import ImpactTable
+
+from .utils import create_dataset, plugin_settings
+
+DEFAULT_COLUMNS = ('ip_address', 'vrf_name', 'assigned_to', 'impact', 'redundancy')
+
+
+class ExportYAMLTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        manufacturer = Manufacturer.objects.create(name='Manufacturer', slug='manufacturer')
+        DeviceType.objects.bulk_create([
+            DeviceType(manufacturer=manufacturer, model=f'Model {i}', slug=f'model-{i}') for i in range(3)
+        ])
+
+    def test_export_yaml(self):
+        response = export_yaml(DeviceType.objects.order_by('model'), filename='netbox_device_types')
+        content = b''.join(response.streaming_content).decode()
+        self.assertEqual(response['Content-Type'], 'text/yaml')
+        self.assertIn('filename="netbox_device_types.yaml"', response['Content-Disposition'])
+        documents = content.split('---\n')
+        self.assertEqual(len(documents), 3)
+        self.assertIn('model: Model 0', documents[0])
+
+
+class ExportViewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+        cls.user = get_user_model().objects.create_user(username='superuser', is_superuser=True)
+
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def export(self, **params):
+        response = self.client.get(reverse('plugins:gestion_impacts:impact_list'), {'export': 'table', **params})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        return response, b''.join(response.streaming_content).decode()
+
+    def get_expected(self):
+        return {
+            str(row['ip_address__address']): row
+            for row in ImpactInventory.objects.values('ip_address__address', 'assigned_to', 'impact')
+        }
+
+    def test_csv(self):
+        response, content = self.export()
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        self.assertIn('filename="netbox_impacts.csv"', response['Content-Disposition'])
+        header, *rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(header, [str(ImpactTable.base_columns[name].verbose_name) for name in DEFAULT_COLUMNS])
+
+        expected = self.get_expected()
+        self.assertEqual(len(rows), len(expected))
+        for row in rows:
+            values = dict(zip(DEFAULT_COLUMNS, row))
+            inventory = expected[values['ip_address']]
+            self.assertEqual(values['assigned_to'], inventory['assigned_to'])
+            self.assertEqual(values['impact'], inventory['impact'] or '')
+
+    def test_jsonl(self):
+        response, content = self.export(format='jsonl')
+        self.assertEqual(response['Content-Type'], 'application/jsonl')
+        rows = [json.loads(line) for line in content.splitlines()]
+        expected = self.get_expected()
+        self.assertEqual({row['ip_address'] for row in rows}, set(expected))
+        for row in rows:
+            self.assertEqual(list(row), list(DEFAULT_COLUMNS))
+            self.assertEqual(row['impact'], expected[row['ip_address']]['impact'])
+
+    def test_selected_columns(self):
+        self.user.config.set('tables.ImpactTable.columns', ['impact', 'ip_address', 'actions'], commit=True)
+        _, content = self.export(format='jsonl')
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual(len(rows), ImpactInventory.objects.count())
+        self.assertEqual({tuple(row) for row in rows}, {('impact', 'ip_address')})
+
+    def test_chunked(self):
+        # Rows are read in chunks much smaller than the export, none of them lost or repeated
+        with plugin_settings(export_chunk_size=7):
+            _, content = self.export(format='jsonl')
+        addresses = [json.loads(line)['ip_address'] for line in content.splitlines()]
+        self.assertEqual(len(addresses), len(set(addresses)))
+        self.assertEqual(set(addresses), set(self.get_expected()))
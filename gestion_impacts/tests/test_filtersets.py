@@ -0,0 +1,104 @@
+from django.db.models import Q
+from django.test import TestCase
+from ipam.models import IPAddress, Prefix, VRF
+
+from gestion_impacts.filtersets import NULL_VRF, ImpactFilterSet
+from gestion_impacts.models import ImpactInventory
+from gestion_impacts.utils import Host
+from gestion_impacts.views import get_ip_address_queryset
+
+from .utils import create_dataset, get_index_names, planner_settings
+
+
+class ImpactFilterSetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+        IPAddress.objects.create(address='192.0.2.1/24', status='active')
+
+    def filter(self, **params):
+        return ImpactFilterSet(params, get_ip_address_queryset(IPAddress.objects.all())).qs
+
+    def test_vrf(self):
+        vrf = VRF.objects.first()
+        pks = set(self.filter(vrf=[vrf.pk]).values_list('pk', flat=True))
+        self.assertTrue(pks)
+        self.assertEqual(pks, set(IPAddress.objects.filter(vrf=vrf).values_list('pk', flat=True)))
+
+    def test_vrf_null(self):
+        vrf = VRF.objects.first()
+        addresses = {str(ip.address) for ip in self.filter(vrf=[vrf.pk, NULL_VRF])}
+        self.assertIn('192.0.2.1/24', addresses)
+        self.assertEqual(len(addresses), IPAddress.objects.filter(vrf=vrf).count() + 1)
+
+    def test_vrf_plan_uses_index(self):
+        # Seq scans are disabled so that the small test tables show which indexes the predicate can use
+        vrf = VRF.objects.first()
+        with planner_settings(enable_seqscan='off'):
+            indexes = get_index_names(self.filter(vrf=[vrf.pk]))
+            null_indexes = get_index_names(self.filter(vrf=[NULL_VRF]))
+        self.assertTrue(any(name.startswith('ipam_ipaddress_vrf_id') for name in indexes), indexes)
+        self.assertTrue(any(name.startswith('ipam_ipaddress_vrf_id') for name in null_indexes), null_indexes)
+
+    def test_search_prefix(self):
+        hosts = set(self.filter(q='192.0.2.0/24').annotate(host=Host('address')).values_list('host', flat=True))
+        self.assertEqual(hosts, {'192.0.2.1'})
+
+    def test_search_address(self):
+        # A complete address keeps matching the addresses which contain it
+        hosts = set(self.filter(q='10.0.0.1').annotate(host=Host('address')).values_list('host', flat=True))
+        self.assertIn('10.0.0.1', hosts)
+        self.assertIn('10.0.0.10', hosts)
+        self.assertNotIn('10.0.0.2', hosts)
+
+    def test_search_partial_address(self):
+        hosts = set(self.filter(q='10.0.0.2').annotate(host=Host('address')).values_list('host', flat=True))
+        self.assertIn('10.0.0.20', hosts)
+
+    def test_search_text(self):
+        inventory = ImpactInventory.objects.filter(impact__isnull=False).first()
+        word = inventory.impact.split()[0]
+        pks = set(self.filter(q=word.upper()).values_list('pk', flat=True))
+        self.assertIn(inventory.ip_address_id, pks)
+        self.assertEqual(pks, set(
+            ImpactInventory.objects.filter(
+                Q(impact__icontains=word) | Q(assigned_to__icontains=word)
+            ).values_list('ip_address_id', flat=True)
+        ))
+
+    def test_search_plan_uses_indexes(self):
+        # Seq scans are disabled so that the small test tables show which indexes each branch can use
+        with planner_settings(enable_seqscan='off'):
+            text_indexes = get_index_names(self.filter(q='supervision'))
+            address_indexes = get_index_names(self.filter(q='10.0.0.1'))
+        self.assertIn('impactinventory_impact_trgm', text_indexes)
+        self.assertIn('impactinventory_assigned_trgm', text_indexes)
+        self.assertIn('impactinventory_impact_trgm', address_indexes)
+        self.assertIn('gestion_impacts_ipaddress_host_trgm', address_indexes)
+
+    def test_parent(self):
+        # Containment in any VRF; invalid prefixes are ignored
+        pks = set(self.filter(parent=['10.0.0.0/28', 'invalid']).values_list('pk', flat=True))
+        self.assertEqual(len(pks), 2 * 15)
+        self.assertEqual(pks, set(
+            IPAddress.objects.filter(address__net_host_contained='10.0.0.0/28').values_list('pk', flat=True)
+        ))
+        self.assertFalse(self.filter(parent=['invalid']).exists())
+
+    def test_prefix_id(self):
+        # Containment within the prefix's VRF only
+        vrf = VRF.objects.first()
+        prefix = Prefix.objects.create(prefix='10.0.0.0/28', vrf=vrf)
+        pks = set(self.filter(prefix_id=[prefix.pk]).values_list('pk', flat=True))
+        self.assertEqual(len(pks), 15)
+        self.assertEqual(pks, set(
+            IPAddress.objects.filter(
+                address__net_host_contained='10.0.0.0/28', vrf=vrf
+            ).values_list('pk', flat=True)
+        ))
+
+    def test_prefix_id_global(self):
+        prefix = Prefix.objects.create(prefix='192.0.2.0/24')
+        addresses = {str(ip.address) for ip in self.filter(prefix_id=[prefix.pk])}
+        self.assertEqual(addresses, {'192.0.2.1/24'})
@@ -0,0 +1,46 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ipam.models import IPAddress
+
+from gestion_impacts.inventory import rebuild_inventory
+from gestion_impacts.models import Impact
+
+from .utils import create_dataset
+
+
+class ImpactGraphQLTestCase(TestCase):
+    query = '{ impact_list { id impact assigned_to ip_address { address } vrf { name } } }'
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset(impact_ratio=0.1)
+        cls.user = get_user_model().objects.create_user(username='superuser', is_superuser=True)
+
+    def run_query(self):
+        """
+        Return the number of listed impacts and the number of queries run to list them.
+        """
+        self.client.force_login(self.user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(reverse('graphql'), {'query': self.query}, content_type='application/json')
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.content)
+        self.assertNotIn('errors', data)
+        return len(data['data']['impact_list']), len(queries)
+
+    def test_impact_list_constant_queries(self):
+        # Nested objects and assigned_to are joined, not fetched once per impact
+        few, few_queries = self.run_query()
+        Impact.objects.bulk_create([
+            Impact(ip_address=ip_address, vrf_id=ip_address.vrf_id, impact='test')
+            for ip_address in IPAddress.objects.filter(ipaddress__isnull=True)
+        ])
+        rebuild_inventory()
+        many, many_queries = self.run_query()
+        self.assertGreater(many, few)
+        self.assertEqual(many_queries, few_queries)
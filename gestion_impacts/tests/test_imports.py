@@ -0,0 +1,89 @@
+import io
+
+from django.db import transaction
+from django.test import TestCase
+from ipam.models import IPAddress, VRF
+
+from gestion_impacts.imports import import_impacts, upsert_impacts
+from gestion_impacts.models import Impact
+
+
+class ImportImpactsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        IPAddress.objects.bulk_create([
+            IPAddress(address=f'192.0.2.{i}/24', status='active') for i in range(1, 6)
+        ])
+
+    def get_file(self, rows):
+        lines = ['address,vrf,impact,redundancy', *(','.join(row) for row in rows)]
+        return io.BytesIO('\n'.join(lines).encode())
+
+    def test_import_chunks_in_outer_transaction(self):
+        # Each chunk is only a savepoint of the outer transaction: the staging table must be reused
+        rows = [(f'192.0.2.{i}', '', f'impact {i}', 'oui') for i in range(1, 6)]
+        with transaction.atomic():
+            result = import_impacts(self.get_file(rows), chunk_size=2)
+        self.assertEqual(result.errors, [])
+        self.assertEqual(result.created, 5)
+        self.assertEqual(Impact.objects.count(), 5)
+
+    def test_import_updates(self):
+        import_impacts(self.get_file([('192.0.2.1', '', 'before', 'non')]))
+        result = import_impacts(self.get_file([('192.0.2.1', '', 'after', 'oui')]))
+        self.assertEqual((result.created, result.updated), (0, 1))
+        impact = Impact.objects.get()
+        self.assertEqual((impact.impact, impact.redundancy), ('after', True))
+
+
+class UpsertImpactsTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        # VRF names are not unique in NetBox
+        cls.vrfs = VRF.objects.bulk_create([VRF(name='PROD'), VRF(name='PROD'), VRF(name='DEV')])
+        IPAddress.objects.bulk_create([
+            IPAddress(address='10.0.0.1/24', vrf=cls.vrfs[0], status='active'),
+            IPAddress(address='10.0.0.1/24', vrf=cls.vrfs[1], status='active'),
+            IPAddress(address='10.0.0.2/24', vrf=cls.vrfs[2], status='active'),
+            IPAddress(address='10.0.0.2/16', vrf=cls.vrfs[2], status='active'),
+            IPAddress(address='10.0.0.3/24', vrf=cls.vrfs[2], status='active'),
+        ])
+
+    def upsert(self, *items, **kwargs):
+        result, results = upsert_impacts(list(items), **kwargs)
+        return [item['status'] for item in results], results
+
+    def test_ambiguous_vrf_name(self):
+        statuses, results = self.upsert({'address': '10.0.0.1', 'vrf': 'PROD', 'impact': 'web'})
+        self.assertEqual(statuses, ['error'])
+        self.assertIn('vrf_id', results[0]['error'])
+
+    def test_vrf_id(self):
+        statuses, _ = self.upsert({'address': '10.0.0.1', 'vrf_id': self.vrfs[1].pk, 'impact': 'web'})
+        self.assertEqual(statuses, ['created'])
+        self.assertEqual(Impact.objects.get().ip_address.vrf, self.vrfs[1])
+
+    def test_duplicate_host_in_vrf(self):
+        statuses, _ = self.upsert({'address': '10.0.0.2', 'vrf': 'DEV', 'impact': 'web'})
+        self.assertEqual(statuses, ['error'])
+        self.assertFalse(Impact.objects.exists())
+
+    def test_repeated_item(self):
+        statuses, results = self.upsert(
+            {'address': '10.0.0.3', 'vrf': 'DEV', 'impact': 'first'},
+            {'address': '10.0.0.3', 'vrf': 'DEV', 'impact': 'second'},
+        )
+        self.assertEqual(statuses, ['created', 'error'])
+        self.assertEqual(Impact.objects.get().impact, 'first')
+
+    def test_restricted_targets(self):
+        item = {'address': '10.0.0.3', 'vrf': 'DEV', 'impact': 'web'}
+        statuses, _ = self.upsert(item, ip_addresses=IPAddress.objects.none())
+        self.assertEqual(statuses, ['error'])
+
+        self.upsert(item)
+        statuses, _ = self.upsert({**item, 'impact': 'changed'}, impacts=Impact.objects.none())
+        self.assertEqual(statuses, ['error'])
+        self.assertEqual(Impact.objects.get().impact, 'web')
@@ -0,0 +1,137 @@
+from dcim.models import Device, Interface
+from django.contrib.contenttypes.models import ContentType
+from django.db import connection
+from django.test import TestCase
+from ipam.models import IPAddress, VRF
+from virtualization.models import VirtualMachine, VMInterface
+
+from gestion_impacts.inventory import rebuild_inventory
+from gestion_impacts.models import Impact, ImpactInventory
+
+from .utils import create_dataset
+
+
+def get_row(ip_address):
+    return ImpactInventory.objects.filter(pk=ip_address.pk).first()
+
+
+def get_assigned_ip_address(interface_model):
+    return IPAddress.objects.filter(
+        assigned_object_type=ContentType.objects.get_for_model(interface_model)
+    ).order_by('pk').first()
+
+
+class InventoryMaintenanceTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def test_impact(self):
+        ip_address = IPAddress.objects.filter(ipaddress__isnull=True).first()
+        impact = Impact.objects.create(ip_address=ip_address, vrf=ip_address.vrf, impact='Messagerie')
+        self.assertEqual((get_row(ip_address).impact_id, get_row(ip_address).impact), (impact.pk, 'Messagerie'))
+
+        impact.impact = 'Paie'
+        impact.redundancy = True
+        impact.save()
+        self.assertEqual((get_row(ip_address).impact, get_row(ip_address).redundancy), ('Paie', True))
+
+        impact.delete()
+        self.assertEqual((get_row(ip_address).impact_id, get_row(ip_address).impact), (None, None))
+
+    def test_ip_address_vrf(self):
+        ip_address = IPAddress.objects.first()
+        vrf = VRF.objects.exclude(pk=ip_address.vrf_id).first()
+        ip_address.vrf = vrf
+        ip_address.save()
+        self.assertEqual((get_row(ip_address).vrf_name, get_row(ip_address).vrf_pk), (vrf.name, vrf.pk))
+
+    def test_ip_address_assignment(self):
+        ip_address = IPAddress.objects.filter(assigned_object_id__isnull=True).first()
+        ip_address.custom_field_data['nom_long'] = 'serveur-1'
+        ip_address.save()
+        self.assertEqual(get_row(ip_address).assigned_to, 'serveur-1')
+
+        vminterface = VMInterface.objects.select_related('virtual_machine').first()
+        ip_address.assigned_object = vminterface
+        ip_address.save()
+        self.assertEqual(get_row(ip_address).assigned_to, vminterface.virtual_machine.name)
+
+    def test_ip_address_status(self):
+        ip_address = IPAddress.objects.first()
+        ip_address.status = 'deprecated'
+        ip_address.save()
+        self.assertIsNone(get_row(ip_address))
+
+    def test_interface(self):
+        ip_address = get_assigned_ip_address(Interface)
+        interface = ip_address.assigned_object
+        device = Device.objects.exclude(pk=interface.device_id).first()
+        interface.device = device
+        interface.name = 'eth99'
+        interface.save()
+        self.assertEqual(get_row(ip_address).assigned_to, device.name)
+
+    def test_vminterface(self):
+        ip_address = get_assigned_ip_address(VMInterface)
+        vminterface = ip_address.assigned_object
+        virtual_machine = VirtualMachine.objects.exclude(pk=vminterface.virtual_machine_id).first()
+        vminterface.virtual_machine = virtual_machine
+        vminterface.name = 'eth99'
+        vminterface.save()
+        self.assertEqual(get_row(ip_address).assigned_to, virtual_machine.name)
+
+    def test_device_rename(self):
+        ip_address = get_assigned_ip_address(Interface)
+        device = ip_address.assigned_object.device
+        device.name = 'renamed-device'
+        device.save()
+        self.assertEqual(get_row(ip_address).assigned_to, 'renamed-device')
+
+    def test_virtual_machine_rename(self):
+        ip_address = get_assigned_ip_address(VMInterface)
+        virtual_machine = ip_address.assigned_object.virtual_machine
+        virtual_machine.name = 'renamed-vm'
+        virtual_machine.save()
+        self.assertEqual(get_row(ip_address).assigned_to, 'renamed-vm')
+
+    def test_vrf_rename(self):
+        vrf = VRF.objects.first()
+        vrf.name = 'renamed-vrf'
+        vrf.save()
+        names = set(ImpactInventory.objects.filter(vrf_pk=vrf.pk).values_list('vrf_name', flat=True))
+        self.assertEqual(names, {'renamed-vrf'})
+
+    def test_delete_ip_address_with_impact(self):
+        ip_address = IPAddress.objects.filter(ipaddress__isnull=False).first()
+        pk = ip_address.pk
+        ip_address.delete()
+        # Deferred foreign keys are checked at commit, which a TestCase never reaches
+        connection.check_constraints()
+        self.assertFalse(ImpactInventory.objects.filter(pk=pk).exists())
+        self.assertFalse(Impact.objects.filter(ip_address=pk).exists())
+
+
+class RebuildInventoryTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def test_drift(self):
+        self.assertEqual(rebuild_inventory(dry_run=True), {'missing': 0, 'stale': 0, 'orphaned': 0})
+
+        # Writes which bypass the signals
+        missing, stale, orphaned = IPAddress.objects.order_by('pk')[:3]
+        ImpactInventory.objects.filter(pk=missing.pk).delete()
+        ImpactInventory.objects.filter(pk=stale.pk).update(assigned_to='stale')
+        IPAddress.objects.filter(pk=orphaned.pk).update(status='deprecated')
+
+        drift = {'missing': 1, 'stale': 1, 'orphaned': 1}
+        self.assertEqual(rebuild_inventory(dry_run=True), drift)
+        self.assertEqual(rebuild_inventory(), drift)
+        self.assertEqual(rebuild_inventory(dry_run=True), {'missing': 0, 'stale': 0, 'orphaned': 0})
+        self.assertTrue(ImpactInventory.objects.filter(pk=missing.pk).exists())
+        self.assertNotEqual(get_row(stale).assigned_to, 'stale')
+        self.assertIsNone(get_row(orphaned))
@@ -0,0 +1,111 @@
+import uuid
+from unittest import mock
+
+from core.choices import JobStatusChoices
+from core.models import Job, ObjectType
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError
+from django.test import TestCase
+from django.urls import reverse
+from ipam.models import IPAddress
+from users.models import ObjectPermission
+
+from gestion_impacts import jobs
+from gestion_impacts.jobs import BULK_EDIT_JOB_NAME, bulk_edit_impacts_job
+from gestion_impacts.models import Impact
+
+
+def create_job(user, name=BULK_EDIT_JOB_NAME.format(count=10)):
+    # Attached to the Impact object type, as enqueued by ImpactBulkEditView
+    impact_type = ObjectType.objects.get_for_model(Impact)
+    return Job.objects.create(
+        object_type=ObjectType.objects.get_for_model(impact_type, for_concrete_model=False),
+        object_id=impact_type.pk,
+        name=name,
+        user=user,
+        job_id=uuid.uuid4(),
+    )
+
+
+def create_user(username, actions=()):
+    user = get_user_model().objects.create_user(username=username)
+    if actions:
+        permission = ObjectPermission.objects.create(name=username, actions=list(actions))
+        permission.object_types.add(ObjectType.objects.get_for_model(Impact))
+        permission.users.add(user)
+    return user
+
+
+class BulkEditImpactsJobTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        IPAddress.objects.bulk_create([
+            IPAddress(address=f'192.0.2.{i}/24', status='active') for i in range(1, 6)
+        ])
+        cls.user = create_user('user')
+
+    def test_progress_and_failures(self):
+        ip_address_ids = list(IPAddress.objects.order_by('pk').values_list('pk', flat=True))
+        failing = ip_address_ids[1]
+        bulk_edit_impacts = jobs.bulk_edit_impacts
+
+        def fail_on_row(queryset, *args, **kwargs):
+            if queryset.filter(pk=failing).exists():
+                raise DatabaseError('row rejected')
+            return bulk_edit_impacts(queryset, *args, **kwargs)
+
+        job = create_job(self.user)
+        with mock.patch.object(jobs, 'bulk_edit_impacts', side_effect=fail_on_row):
+            bulk_edit_impacts_job(job, ip_address_ids, {'impact': 'edited'}, chunk_size=2)
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, JobStatusChoices.STATUS_COMPLETED)
+        self.assertEqual(
+            {key: job.data[key] for key in ('total', 'processed', 'created', 'updated', 'failed')},
+            {'total': 5, 'processed': 5, 'created': 4, 'updated': 0, 'failed': 1},
+        )
+        self.assertEqual(job.data['failures'], [
+            {'ip_address': failing, 'address': '192.0.2.2/24', 'error': 'row rejected'},
+        ])
+        # The failing row is alone in its chunk's retry: the other rows are committed
+        self.assertEqual(
+            set(Impact.objects.values_list('ip_address', flat=True)), set(ip_address_ids) - {failing}
+        )
+
+
+class ImpactJobViewTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.owner = create_user('owner', actions=['change'])
+        cls.other = create_user('other', actions=['change'])
+        cls.viewer = create_user('viewer')
+        cls.job = create_job(cls.owner)
+        cls.url = reverse('plugins:gestion_impacts:impact_job', kwargs={'pk': cls.job.pk})
+
+    def test_owner(self):
+        self.client.force_login(self.owner)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_other_user(self):
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_job_permission(self):
+        permission = ObjectPermission.objects.create(name='jobs', actions=['view'])
+        permission.object_types.add(ObjectType.objects.get_for_model(Job))
+        permission.users.add(self.other)
+        self.client.force_login(self.other)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+    def test_change_impact_required(self):
+        self.client.force_login(self.viewer)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+    def test_other_jobs(self):
+        # Jobs which are not bulk edits of impacts are not shown, whatever the permissions
+        job = create_job(self.owner, name='Impact coverage refresh')
+        self.client.force_login(self.owner)
+        url = reverse('plugins:gestion_impacts:impact_job', kwargs={'pk': job.pk})
+        self.assertEqual(self.client.get(url).status_code, 404)
@@ -0,0 +1,40 @@
+from django.test import TestCase
+from ipam.models import IPAddress
+
+from gestion_impacts.pagination import KeysetPaginator, encode_cursor, get_ip_address_keys
+
+from .utils import create_dataset
+
+
+class KeysetPaginatorTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def get_paginator(self):
+        return KeysetPaginator(IPAddress.objects.all(), get_ip_address_keys(), per_page=10)
+
+    def test_next_page(self):
+        paginator = self.get_paginator()
+        first = paginator.get_page()
+        second = paginator.get_page(first.next_cursor)
+        first_pks = {ip.pk for ip in first.object_list}
+        second_pks = {ip.pk for ip in second.object_list}
+        self.assertEqual(len(second_pks), 10)
+        self.assertFalse(first_pks & second_pks)
+
+    def test_invalid_cursors(self):
+        paginator = self.get_paginator()
+        first_pks = [ip.pk for ip in paginator.get_page().object_list]
+        for cursor in (
+            'not-a-cursor',
+            encode_cursor([1, '10.0.0.1/24']),
+            encode_cursor([1, '10.0.0.1/24', 1, 1]),
+            encode_cursor(['abc', '10.0.0.1/24', 1]),
+            encode_cursor([1, 'not-an-address', 1]),
+            encode_cursor([1, '10.0.0.1/24', None]),
+        ):
+            with self.subTest(cursor=cursor):
+                page = paginator.get_page(cursor)
+                self.assertEqual([ip.pk for ip in page.object_list], first_pks)
@@ -0,0 +1,48 @@
+from django.test import TestCase
+from ipam.models import IPAddress, Prefix, VRF
+
+from gestion_impacts.models import ImpactInventory
+from gestion_impacts.prefixes import get_child_prefix_summary
+
+from .utils import create_dataset
+
+
+class ChildPrefixSummaryTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+        cls.vrf = VRF.objects.first()
+        cls.prefix = Prefix.objects.create(prefix='10.0.0.0/24', vrf=cls.vrf)
+        for prefix in ('10.0.0.0/28', '10.0.0.16/28', '10.0.0.16/29'):
+            Prefix.objects.create(prefix=prefix, vrf=cls.vrf)
+
+    def get_counts(self, prefix):
+        inventory = ImpactInventory.objects.filter(
+            ip_address__in=IPAddress.objects.filter(address__net_host_contained=prefix, vrf=self.vrf)
+        )
+        return {
+            'ip_addresses': inventory.count(),
+            'impacts': inventory.filter(impact_id__isnull=False).count(),
+            'non_redundant': inventory.filter(impact_id__isnull=False, redundancy=False).count(),
+        }
+
+    def test_summary(self):
+        self.prefix.refresh_from_db()
+        summary = get_child_prefix_summary(self.prefix)
+
+        self.assertEqual((summary['prefix'], summary['vrf']), ('10.0.0.0/24', self.vrf.name))
+        self.assertEqual(summary['ip_addresses'], 30)
+        self.assertEqual({key: summary[key] for key in self.get_counts('10.0.0.0/24')}, self.get_counts('10.0.0.0/24'))
+
+        # Direct children only, in order
+        self.assertEqual([child['prefix'] for child in summary['children']], ['10.0.0.0/28', '10.0.0.16/28'])
+        for child in summary['children']:
+            counts = self.get_counts(child['prefix'])
+            self.assertEqual({key: child[key] for key in counts}, counts)
+        self.assertEqual(sum(child['ip_addresses'] for child in summary['children']), 30)
+
+    def test_empty_prefix(self):
+        prefix = Prefix.objects.create(prefix='10.1.0.0/24', vrf=self.vrf)
+        summary = get_child_prefix_summary(prefix)
+        self.assertEqual((summary['ip_addresses'], summary['impacts'], summary['children']), (0, 0, []))
@@ -0,0 +1,38 @@
+from django.contrib.auth.models import AnonymousUser
+from django.test import RequestFactory, TestCase, override_settings
+from ipam.models import IPAddress
+
+from gestion_impacts.slow_queries import capture_slow_queries, clear_slow_requests, get_slow_requests
+
+PLUGINS_CONFIG = {
+    'gestion_impacts': {
+        'slow_query_threshold': 0,
+        'slow_query_buffer_size': 3,
+    },
+}
+
+
+@override_settings(PLUGINS_CONFIG=PLUGINS_CONFIG)
+class SlowQueriesTestCase(TestCase):
+
+    def setUp(self):
+        clear_slow_requests()
+        self.addCleanup(clear_slow_requests)
+
+    def capture(self, name):
+        request = RequestFactory().get('/plugins/gestion_impacts/impacts/', {'q': name})
+        request.user = AnonymousUser()
+        with capture_slow_queries(request, name):
+            list(IPAddress.objects.all())
+
+    def test_ring_buffer(self):
+        for i in range(5):
+            self.capture(f'view{i}')
+        self.assertEqual([entry['view'] for entry in get_slow_requests()], ['view4', 'view3', 'view2'])
+
+    def test_plan_without_analyze(self):
+        # The captured queries are planned, not executed once more
+        self.capture('view')
+        plan = get_slow_requests()[0]['queries'][0]['plan']
+        self.assertIn('ipam_ipaddress', plan)
+        self.assertNotIn('actual time', plan)
@@ -0,0 +1,112 @@
+from core.models import ObjectType
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.template import Context
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from ipam.models import IPAddress
+from users.models import ObjectPermission
+
+from gestion_impacts.tables import CountedTableData, ImpactTable
+from gestion_impacts.views import get_ip_address_queryset
+
+from .utils import create_dataset
+
+
+def create_user(username, **kwargs):
+    """
+    Create a user allowed to view, change and delete IP addresses.
+    """
+    user = get_user_model().objects.create_user(username=username, **kwargs)
+    permission = ObjectPermission.objects.create(name=username, actions=['view', 'change', 'delete'])
+    permission.object_types.add(ObjectType.objects.get_for_model(IPAddress))
+    permission.users.add(user)
+    return user
+
+
+def get_table(user, rows, fields=None):
+    request = RequestFactory().get('/plugins/gestion_impacts/impacts/')
+    # Fresh user instance, without cached permissions
+    request.user = get_user_model().objects.get(pk=user.pk)
+    table = ImpactTable(list(get_ip_address_queryset(IPAddress.objects.all(), fields=fields)[:rows]))
+    table.context = Context({'request': request})
+    return table
+
+
+def render_rows(table):
+    return [[cell for cell in row] for row in table.rows]
+
+
+def render_actions(table):
+    return [row.get_cell('actions') for row in table.rows]
+
+
+class ImpactTableTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+        cls.superuser = get_user_model().objects.create_user(username='superuser', is_superuser=True)
+        cls.user = create_user('user')
+
+    def test_action_urls(self):
+        table = get_table(self.superuser, 50)
+        for row, html in zip(table.rows, render_actions(table)):
+            record = row.record
+            if record.impact_id is not None:
+                for action in ('edit', 'delete'):
+                    url = reverse(f'plugins:gestion_impacts:impact_{action}', kwargs={'pk': record.impact_id})
+                    self.assertIn(f'href="{url}?', html)
+            else:
+                url = reverse('plugins:gestion_impacts:impact_add')
+                self.assertIn(f'href="{url}?ip_address={record.pk}&', html)
+
+    def test_action_urls_without_assigned_to(self):
+        # A record without the annotation must not prefill the form with an empty value
+        table = get_table(self.superuser, 5, fields=('impact_id',))
+        for html in render_actions(table):
+            self.assertNotIn('assigned_to=', html)
+
+    def test_list_view_annotates_action_fields(self):
+        # Hiding the assigned column keeps the value the actions column prefills
+        self.superuser.config.set('tables.ImpactTable.columns', ['ip_address', 'impact'], commit=True)
+        self.client.force_login(self.superuser)
+        response = self.client.get(reverse('plugins:gestion_impacts:impact_list'))
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, 'assigned_to=bench-')
+
+    def test_actions_column_queries(self):
+        # Everything the actions column needs is annotated on the records: no query at all for a superuser
+        table = get_table(self.superuser, 50)
+        with self.assertNumQueries(0):
+            render_rows(table)
+
+    def test_actions_column_constant_queries(self):
+        # Permissions are resolved once per table, whatever the number of rows
+        query_counts = []
+        for rows in (5, 50):
+            table = get_table(self.user, rows)
+            with CaptureQueriesContext(connection) as queries:
+                render_rows(table)
+            query_counts.append(len(queries))
+        self.assertEqual(query_counts[0], query_counts[1])
+        self.assertLessEqual(query_counts[1], 2)
+
+    def test_render_state_cached(self):
+        # Permissions, URL patterns and the return_url are resolved for the first row only
+        table = get_table(self.user, 50)
+        column = table.columns['actions'].column
+        state = column.get_render_state(table)
+        with self.assertNumQueries(0):
+            render_actions(table)
+        self.assertIs(column.get_render_state(table), state)
+
+    def test_counted_data(self):
+        # The known count is used by the paginator instead of a COUNT query
+        queryset = get_ip_address_queryset(IPAddress.objects.all())
+        table = ImpactTable(CountedTableData(queryset, 1234))
+        with CaptureQueriesContext(connection) as queries:
+            table.paginate(per_page=10)
+        self.assertEqual(table.paginator.count, 1234)
+        self.assertFalse([query for query in queries if 'COUNT(' in query['sql'].upper()])
@@ -0,0 +1,80 @@
+from core.models import ObjectType
+from dcim.models import Device
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+from ipam.models import IPAddress
+from users.models import ObjectPermission
+
+from gestion_impacts.models import Impact
+
+from .utils import create_dataset
+
+
+def grant(user, model, actions, constraints=None):
+    permission = ObjectPermission.objects.create(
+        name=f'{user.username}-{model._meta.model_name}', actions=list(actions), constraints=constraints
+    )
+    permission.object_types.add(ObjectType.objects.get_for_model(model))
+    permission.users.add(user)
+
+
+class ImpactPanelTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+        cls.impact = Impact.objects.filter(ip_address__interface__isnull=False).select_related('ip_address').first()
+        cls.ip_address = cls.impact.ip_address
+
+    def get_user(self, *impact_actions, ip_address_constraints=None):
+        user = get_user_model().objects.create_user(username='user')
+        grant(user, IPAddress, ['view'], ip_address_constraints)
+        grant(user, Device, ['view'])
+        if impact_actions:
+            grant(user, Impact, impact_actions)
+        self.client.force_login(user)
+        return user
+
+    def get_ip_address_page(self):
+        response = self.client.get(self.ip_address.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_ip_address_panel_hidden(self):
+        self.get_user()
+        self.assertNotIn(self.impact.get_absolute_url(), self.get_ip_address_page())
+
+    def test_ip_address_panel(self):
+        self.get_user('view')
+        content = self.get_ip_address_page()
+        self.assertIn(self.impact.get_absolute_url(), content)
+        self.assertNotIn(reverse('plugins:gestion_impacts:impact_edit', kwargs={'pk': self.impact.pk}), content)
+
+    def test_ip_address_panel_edit(self):
+        self.get_user('view', 'change')
+        content = self.get_ip_address_page()
+        self.assertIn(reverse('plugins:gestion_impacts:impact_edit', kwargs={'pk': self.impact.pk}), content)
+        self.assertNotIn(reverse('plugins:gestion_impacts:impact_add'), content)
+
+    def test_device_panel_restricted(self):
+        # Only the IP addresses visible to the user are listed
+        device = Device.objects.get(interfaces__ip_addresses=self.ip_address)
+        hidden = IPAddress.objects.filter(interface__device=device).exclude(pk=self.ip_address.pk)
+        self.assertTrue(hidden.exists())
+        self.get_user('view', ip_address_constraints={'pk': self.ip_address.pk})
+
+        response = self.client.get(device.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        content = response.content.decode()
+        self.assertIn(self.ip_address.get_absolute_url(), content)
+        self.assertIn(self.impact.get_absolute_url(), content)
+        for ip_address in hidden:
+            self.assertNotIn(ip_address.get_absolute_url(), content)
+
+    def test_device_panel_hidden(self):
+        self.get_user()
+        device = Device.objects.get(interfaces__ip_addresses=self.ip_address)
+        response = self.client.get(device.get_absolute_url())
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn(self.ip_address.get_absolute_url(), response.content.decode())
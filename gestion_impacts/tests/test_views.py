@@ -0,0 +1,38 @@
+from django.test import TestCase
+from ipam.models import IPAddress
+
+from gestion_impacts.inventory import get_inventoried_ip_addresses
+from gestion_impacts.models import Impact
+from gestion_impacts.views import IMPACT_ANNOTATIONS, get_ip_address_queryset
+
+from .utils import create_dataset, get_plan, iter_plan_nodes
+
+
+class ImpactListQuerysetTestCase(TestCase):
+
+    @classmethod
+    def setUpTestData(cls):
+        create_dataset()
+
+    def test_no_subplan(self):
+        queryset = get_ip_address_queryset(IPAddress.objects.all())
+        subplans = [
+            node['Node Type'] for node in iter_plan_nodes(get_plan(queryset))
+            if node.get('Parent Relationship') == 'SubPlan' or 'Subplan Name' in node
+        ]
+        self.assertEqual(subplans, [])
+
+    def test_one_row_per_ip_address(self):
+        queryset = get_ip_address_queryset(IPAddress.objects.all())
+        pks = list(queryset.values_list('pk', flat=True))
+        self.assertEqual(len(pks), len(set(pks)))
+        self.assertEqual(len(pks), get_inventoried_ip_addresses().count())
+
+    def test_columns(self):
+        impact = Impact.objects.select_related('ip_address').first()
+        row = get_ip_address_queryset(IPAddress.objects.all()).get(pk=impact.ip_address_id)
+        for name in IMPACT_ANNOTATIONS:
+            self.assertTrue(hasattr(row, name))
+        self.assertEqual(row.impact_id, impact.pk)
+        self.assertEqual(row.impact, impact.impact)
+        self.assertEqual(row.redundancy, impact.redundancy)
@@ -0,0 +1,60 @@
+import copy
+import json
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test import override_settings
+
+from gestion_impacts.benchmarks import seed_dataset
+
+
+def create_dataset(**kwargs):
+    """
+    Create a small synthetic dataset (see benchmarks.seed_dataset) for the tests.
+    """
+    options = {'vrfs': 2, 'devices': 4, 'vms': 4, 'interfaces': 2, 'ip_addresses': 60, 'log': lambda message: None}
+    seed_dataset(**{**options, **kwargs})
+
+
+def get_plan(queryset):
+    """
+    Return the root node of the JSON EXPLAIN plan of a queryset.
+    """
+    return json.loads(queryset.explain(format='json'))[0]['Plan']
+
+
+def iter_plan_nodes(node):
+    yield node
+    for child in node.get('Plans', []):
+        yield from iter_plan_nodes(child)
+
+
+def get_index_names(queryset):
+    return {node['Index Name'] for node in iter_plan_nodes(get_plan(queryset)) if 'Index Name' in node}
+
+
+@contextmanager
+def planner_settings(**settings):
+    """
+    Override planner settings (e.g. enable_seqscan='off'), so that plans on the small test tables show which
+    indexes a query can use.
+    """
+    with connection.cursor() as cursor:
+        for name, value in settings.items():
+            cursor.execute(f'SET {name} = {value}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name in settings:
+                cursor.execute(f'RESET {name}')
+
+
+def plugin_settings(**options):
+    """
+    Override some settings of the plugin, keeping the others.
+    """
+    config = copy.deepcopy(settings.PLUGINS_CONFIG)
+    config['gestion_impacts'].update(options)
+    return override_settings(PLUGINS_CONFIG=config)
@@ -8,11 +8,16 @@ app_name = 'gestion_impacts'
 urlpatterns = [
     path('impacts/', views.ImpactListView.as_view(), name='impact_list'),
     path('impacts/add/', views.ImpactEditView.as_view(), name='impact_add'),
+    path('impacts/import/', views.ImpactImportView.as_view(), name='impact_import'),
     path('impacts/delete/', views.ImpactBulkDeleteView.as_view(), name='impact_bulk_delete'),
     path('impacts/<int:pk>/', views.ImpactView.as_view(), name='impact'),
     path('impacts/<int:pk>/edit/', views.ImpactEditView.as_view(), name='impact_edit'),
     path('impacts/edit/', views.ImpactBulkEditView.as_view(), name='impact_bulk_edit'),
     path('impacts/<int:pk>/delete/', views.ImpactDeleteView.as_view(), name='impact_delete'),
+    path('impacts/blast-radius/', views.ImpactBlastRadiusView.as_view(), name='impact_blast_radius'),
+    path('impacts/coverage/', views.ImpactCoverageView.as_view(), name='impact_coverage'),
+    path('impacts/slow-queries/', views.ImpactSlowQueriesView.as_view(), name='impact_slow_queries'),
+    path('impacts/jobs/<int:pk>/', views.ImpactJobView.as_view(), name='impact_job'),
     path('impacts/<int:pk>/changelog/', ObjectChangeLogView.as_view(), name='impact_changelog',
          kwargs={'model': models.Impact}),
 
@@ -0,0 +1,38 @@
+import netaddr
+from django.db.models import CharField, F, Func
+from ipam.models import IPAddress
+
+
+class Host(Func):
+    """
+    Postgres' HOST() of an inet column: the address without its mask length, as text.
+    """
+    function = 'HOST'
+    output_field = CharField()
+
+
+def normalize_host(address):
+    """
+    Return the canonical host part of an address ("10.0.0.1/24" -> "10.0.0.1"), as rendered by Postgres' HOST().
+    Raises ValueError if the address is invalid.
+    """
+    try:
+        return str(netaddr.IPAddress(str(address).strip().split('/')[0]))
+    except (netaddr.AddrFormatError, ValueError, TypeError):
+        raise ValueError(f"Invalid IP address: {address}")
+
+
+def resolve_ip_addresses(hosts, queryset=None):
+    """
+    Resolve a set of host addresses to IP addresses in one query. Returns a dict mapping each host to the list of
+    its (IPAddress pk, VRF pk, VRF name) tuples: neither hosts nor VRF names are unique in NetBox.
+    """
+    if queryset is None:
+        queryset = IPAddress.objects.all()
+    queryset = queryset.annotate(
+        host=Host(F('address'))
+    ).filter(host__in=set(hosts))
+    ip_addresses = {}
+    for pk, host, vrf_id, vrf_name in queryset.values_list('pk', 'host', 'vrf_id', 'vrf__name').order_by('pk'):
+        ip_addresses.setdefault(host, []).append((pk, vrf_id, vrf_name))
+    return ip_addresses
@@ -1,101 +1,180 @@
 import logging
 
-from core.models import ObjectType
-from dcim.models import Device
+from core.models import Job, ObjectType
 from django.contrib import messages
+from django.contrib.auth.mixins import UserPassesTestMixin
 from django.contrib.contenttypes.fields import GenericRel
 from django.core.exceptions import FieldDoesNotExist
 from django.core.exceptions import ValidationError
 from django.db import transaction
-from django.db.models import F, Value, CharField, Q, OuterRef, Subquery
+from django.db.models import F, Q
 from django.db.models import ManyToManyField
-from django.db.models.fields.json import KeyTextTransform
 from django.db.models.fields.reverse_related import ManyToManyRel
-from django.db.models.functions import Coalesce
-from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, render, redirect
+from django.urls import reverse
 from django.utils.html import escape
 from django.utils.safestring import mark_safe
+from django.views.generic import View
 from extras.models import ExportTemplate
 from extras.signals import clear_events
-from ipam.models import IPAddress
+from ipam.models import IPAddress, Prefix
+from netbox.plugins.utils import get_plugin_config
 from netbox.views import generic
 from netbox.views.generic.utils import get_prerequisite_model
 from utilities.exceptions import AbortRequest, PermissionsViolation
 from utilities.forms import restrict_form_fields
 from utilities.htmx import htmx_partial
+from utilities.paginator import get_paginate_count
 from utilities.querydict import prepare_cloned_fields, normalize_querydict
-from virtualization.models import VirtualMachine
-
+from utilities.views import ContentTypePermissionRequiredMixin
+
+from .blast_radius import get_blast_radius
+from .bulk import bulk_edit_impacts
+from .cache import get_cached_count
+from .coverage import get_coverage
+from .custom import ACTIONS_COLUMN_FIELDS
+from .conditional import get_not_modified_response, get_validators, set_validators
+from .exports import EXPORT_ACCESSORS, export_rows, export_yaml
 from .filtersets import ImpactFilterSet
-from .forms import ImpactForm, ImpactBulkEditForm, ImpactIpAddressFilterSetForm
-from .models import Impact
-from .tables import ImpactTable
+from .forms import (
+    BlastRadiusForm, ImpactForm, ImpactBulkEditForm, ImpactBulkImportForm, ImpactIpAddressFilterSetForm
+)
+from .imports import import_impacts
+from .inventory import INVENTORY_FIELDS, get_inventoried_ip_addresses
+from .jobs import BULK_EDIT_JOB_NAME, bulk_edit_impacts_job, get_bulk_edit_jobs, get_coverage_jobs
+from .metrics import InstrumentedViewMixin
+from .slow_queries import SlowQueryCaptureMixin, clear_slow_requests, get_slow_requests
+from .models import Impact, ImpactInventory
+from .prefixes import get_child_prefix_summary
+from .pagination import KeysetPaginator, estimate_count, get_ip_address_keys, keyset_pagination_enabled
+from .tables import CountedTableData, ImpactTable
 
 
 class ImpactView(generic.ObjectView):
-    queryset = Impact.objects.all()
+    queryset = Impact.objects.select_related('ip_address', 'vrf')
+
+    def get_extra_context(self, request, instance):
+        # Name of an unassigned IP address (nom_long custom field), as listed by the inventory
+        assigned_to = ImpactInventory.objects.filter(ip_address=instance.ip_address_id).values_list(
+            'assigned_to', flat=True
+        ).first()
+        return {
+            'assigned_to': assigned_to,
+        }
+
+
+# Annotations exposed by get_ip_address_queryset()
+IMPACT_ANNOTATIONS = ('ip_address', 'vrf_name', 'assigned_to', 'impact_id', 'impact', 'redundancy')
 
 
-def get_ip_address_queryset():
-    device_name_subquery = Device.objects.filter(
-        interfaces__ip_addresses=OuterRef('pk')
-    ).values('name')[:1]
-
-    vm_name_subquery = VirtualMachine.objects.filter(
-        interfaces__ip_addresses=OuterRef('pk')
-    ).values('name')[:1]
-
-    impact_subquery = Impact.objects.filter(
-        ip_address=OuterRef('pk')
-    ).values('impact')[:1]
-
-    redundancy_subquery = Impact.objects.filter(
-        ip_address=OuterRef('pk')
-    ).values('redundancy')[:1]
-
-    queryset = IPAddress.objects.filter(status='active').annotate(
-        ip_address=F('address'),
-        vrf_name=F('vrf__name'),
-        device_name=Subquery(device_name_subquery, output_field=CharField()),
-        vm_name=Subquery(vm_name_subquery, output_field=CharField()),
-        impact_id=Subquery(
-            Impact.objects.filter(ip_address=OuterRef('pk')).values('id')[:1]
-        ),
-        assigned_to=Coalesce(
-            Subquery(device_name_subquery, output_field=CharField()),
-            Subquery(vm_name_subquery, output_field=CharField()),
-            KeyTextTransform('nom_long', 'custom_field_data', output_field=CharField()),
-            Value('Not Assigned', output_field=CharField())
-        ),
-        impact=Subquery(impact_subquery, output_field=CharField()),
-        redundancy=Subquery(redundancy_subquery, output_field=CharField())
-    ).select_related('vrf').filter(
-        Q(assigned_object_type__model='interface', assigned_object_type__app_label='dcim') |
-        Q(assigned_object_type__model='vminterface', assigned_object_type__app_label='virtualization') |
-        Q(assigned_object_id__isnull=True)
-    )
-    return queryset
-
-
-class ImpactListView(generic.ObjectListView):
-    queryset = get_ip_address_queryset()
+def get_ip_address_queryset(queryset=None, fields=None):
+    """
+    Return the active IP addresses annotated with their Impact, read from the impact inventory. Only the
+    annotations named in `fields` are built (all of IMPACT_ANNOTATIONS by default).
+    """
+    fields = set(IMPACT_ANNOTATIONS if fields is None else fields)
+    annotations = {
+        'ip_address': F('address'),
+        **{name: F(f'impact_inventory__{name}') for name in INVENTORY_FIELDS},
+    }
+
+    return get_inventoried_ip_addresses(queryset).annotate(
+        **{name: expression for name, expression in annotations.items() if name in fields}
+    ).select_related('vrf')
+
+
+class ImpactListView(SlowQueryCaptureMixin, InstrumentedViewMixin, generic.ObjectListView):
+    queryset = IPAddress.objects.all()
 
     table = ImpactTable
     template_name = 'gestion_impacts/impact_list.html'
     filterset = ImpactFilterSet
     filterset_form = ImpactIpAddressFilterSetForm
 
+    def get_table_columns(self, request):
+        columns = None
+        if request.user.is_authenticated:
+            columns = request.user.config.get(f'tables.{self.table.__name__}.columns')
+        return columns or getattr(self.table.Meta, 'default_columns', self.table.Meta.fields)
+
+    def get_annotations(self, request):
+        """
+        Return the annotations needed to render the selected columns and apply the ordering. Filters only use
+        indexed columns and need no annotation.
+        """
+        if 'export' in request.GET and request.GET['export'] != 'table':
+            return None
+
+        # The actions column is always rendered, whichever columns are selected
+        fields = {*ACTIONS_COLUMN_FIELDS, *self.get_table_columns(request)}
+        ordering = request.GET.getlist('sort')
+        if not ordering and request.user.is_authenticated:
+            ordering = request.user.config.get(f'tables.{self.table.__name__}.ordering') or []
+        fields.update(name.lstrip('-') for name in ordering)
+
+        return fields.intersection(IMPACT_ANNOTATIONS)
+
     def get_queryset(self, request):
-        queryset = super().get_queryset(request)
-        return self.filterset(self.request.GET, queryset=queryset).qs
+        queryset = get_ip_address_queryset(self.queryset, fields=self.get_annotations(request))
+        return self.filterset(request.GET, queryset, request=request).qs
+
+    def get_export_columns(self, request):
+        """
+        Return the (name, header) tuples of the exported columns: the selected table columns for a table export,
+        every column otherwise.
+        """
+        if request.GET['export'] == 'table':
+            names = self.get_table_columns(request)
+        else:
+            names = self.table.Meta.fields
+        exportable = {*IMPACT_ANNOTATIONS, *EXPORT_ACCESSORS}
+        return [
+            (name, self.table.base_columns[name].verbose_name)
+            for name in names if name in exportable and name in self.table.base_columns
+        ]
+
+    def export_queryset(self, queryset, request):
+        return export_rows(
+            queryset,
+            self.get_export_columns(request),
+            export_format=request.GET.get('format', 'csv'),
+            chunk_size=get_plugin_config('gestion_impacts', 'export_chunk_size'),
+        )
+
+    def get_table(self, data, request, bulk_actions=True, count=None, orderable=True):
+        if count is not None:
+            data = CountedTableData(data, count)
+        table = self.table(data, user=request.user, orderable=orderable)
+        if 'pk' in table.base_columns and bulk_actions:
+            table.columns.show('pk')
+        table.configure(request)
+        return table
+
+    @staticmethod
+    def get_cursor_url(request, cursor):
+        if cursor is None:
+            return None
+        params = request.GET.copy()
+        params['cursor'] = cursor
+        return f'{request.path}?{params.urlencode()}'
+
+    def get_partial_validators(self, request):
+        table_config = None
+        if request.user.is_authenticated:
+            table_config = request.user.config.get(f'tables.{self.table.__name__}')
+        return get_validators(request, request.htmx.target, table_config)
 
     def get(self, request):
         model = self.queryset.model
-        object_type = ObjectType.objects.get_for_model(model)
 
-        if self.filterset:
-            self.queryset = self.filterset(request.GET, self.queryset, request=request).qs
+        # The table partial is only rendered again if the listed data or the table configuration have changed
+        validators = None
+        if htmx_partial(request) and 'export' not in request.GET:
+            validators = self.get_partial_validators(request)
+            if response := get_not_modified_response(request, *validators):
+                return set_validators(response, *validators, vary=('HX-Request', 'HX-Target'))
+
+        queryset = self.get_queryset(request)
 
         actions = self.get_permitted_actions(request.user)
         has_bulk_actions = any([a.startswith('bulk_') for a in actions])
@@ -103,25 +182,59 @@ class ImpactListView(generic.ObjectListView):
         if 'export' in request.GET:
 
             if request.GET['export'] == 'table':
-                table = self.get_table(self.queryset, request, has_bulk_actions)
-                columns = [name for name, _ in table.selected_columns]
-                return self.export_table(table, columns)
+                return self.export_queryset(queryset, request)
 
             elif request.GET['export']:
+                object_type = ObjectType.objects.get_for_model(model)
                 template = get_object_or_404(ExportTemplate, object_types=object_type, name=request.GET['export'])
-                return self.export_template(template, request)
+                try:
+                    return template.render_to_response(queryset)
+                except Exception as e:
+                    messages.error(request, f"There was an error rendering the selected export template "
+                                            f"({template.name}): {e}")
+                    return redirect(request.path)
 
             elif hasattr(model, 'to_yaml'):
-                response = HttpResponse(self.export_yaml(), content_type='text/yaml')
-                filename = 'netbox_{}.yaml'.format(self.queryset.model._meta.verbose_name_plural)
-                response['Content-Disposition'] = 'attachment; filename="{}"'.format(filename)
-                return response
+                return export_yaml(
+                    queryset,
+                    filename=f'netbox_{model._meta.verbose_name_plural}',
+                    chunk_size=get_plugin_config('gestion_impacts', 'export_chunk_size'),
+                )
 
             else:
-                table = self.get_table(self.queryset, request, has_bulk_actions)
-                return self.export_table(table)
-
-        table = self.get_table(self.queryset, request, has_bulk_actions)
+                return self.export_queryset(queryset, request)
+
+        if keyset_pagination_enabled(request.GET):
+            paginator = KeysetPaginator(queryset, get_ip_address_keys(), get_paginate_count(request))
+            with self.metrics.stage('page'):
+                keyset_page = paginator.get_page(request.GET.get('cursor'))
+            # Rows are always ordered on the keyset: the table must not apply the user's saved ordering
+            table = self.get_table(keyset_page.object_list, request, has_bulk_actions, orderable=False)
+            with self.metrics.stage('count'):
+                object_count, exact_count = get_cached_count(
+                    request, lambda: estimate_count(queryset), kind='estimate'
+                )
+            self.metrics.rows = len(keyset_page)
+            table_context = {
+                'table': table,
+                'keyset_page': keyset_page,
+                'next_url': self.get_cursor_url(request, keyset_page.next_cursor),
+                'previous_url': self.get_cursor_url(request, keyset_page.previous_cursor),
+                'object_count': object_count,
+                'exact_count': exact_count,
+            }
+            table_template = 'gestion_impacts/htmx/keyset_table.html'
+        else:
+            with self.metrics.stage('count'):
+                count = get_cached_count(request, queryset.count)
+            table = self.get_table(queryset, request, has_bulk_actions, count=count)
+            self.metrics.rows = len(table.page.object_list) if getattr(table, 'page', None) else len(table.rows)
+            table_context = {
+                'table': table,
+                'object_count': table.page.paginator.count,
+                'exact_count': True,
+            }
+            table_template = 'htmx/table.html'
 
         if htmx_partial(request):
             if not request.htmx.target:
@@ -129,31 +242,38 @@ class ImpactListView(generic.ObjectListView):
                 # Hide selection checkboxes
                 if 'pk' in table.base_columns:
                     table.columns.hide('pk')
-            return render(request, 'htmx/table.html', {
-                'table': table,
-            })
+            with self.metrics.stage('render'):
+                response = render(request, table_template, table_context)
+            return set_validators(response, *validators, vary=('HX-Request', 'HX-Target'))
 
         action_to_remove = ['bulk_import', 'add', 'import']
         for action in action_to_remove:
             if action in actions:
                 actions.remove(action)
 
-        model._meta.verbose_name_plural = 'Gestion des impacts'
+        # Counts per child prefix when the list is filtered on a single prefix
+        prefix_summary = None
+        if len(prefix_ids := request.GET.getlist('prefix_id')) == 1 and prefix_ids[0].isdigit():
+            if prefix := Prefix.objects.restrict(request.user, 'view').filter(pk=prefix_ids[0]).first():
+                prefix_summary = get_child_prefix_summary(prefix)
 
         context = {
             'model': model,
+            'title': 'Gestion des impacts',
+            'prefix_summary': prefix_summary,
             'extra_model': Impact(),
-            'table': table,
+            **table_context,
             'actions': actions,
             'filter_form': self.filterset_form(request.GET, label_suffix='') if self.filterset_form else None,
-            'prerequisite_model': get_prerequisite_model(self.queryset),
+            'prerequisite_model': get_prerequisite_model(queryset),
             **self.get_extra_context(request),
         }
 
-        return render(request, self.template_name, context)
+        with self.metrics.stage('render'):
+            return render(request, self.template_name, context)
 
 
-class ImpactEditView(generic.ObjectEditView):
+class ImpactEditView(InstrumentedViewMixin, generic.ObjectEditView):
     queryset = Impact.objects.all()
     form = ImpactForm
     template_name = 'gestion_impacts/impact_edit.html'
@@ -208,9 +328,16 @@ class ImpactEditView(generic.ObjectEditView):
                                 **self.get_extra_context(request, obj),
                             })
                         ip_address = IPAddress.objects.filter(pk=ip_address_id).first()
-                        if not ip_address or not ip_address.vrf:
-                            messages.error(request,
-                                           "IP address not found" if not ip_address else "IP address has no VRF")
+                        if not ip_address:
+                            error = "IP address not found"
+                        elif not ip_address.vrf:
+                            error = "IP address has no VRF"
+                        elif Impact.objects.filter(ip_address=ip_address).exists():
+                            error = "IP address already has an impact"
+                        else:
+                            error = None
+                        if error:
+                            messages.error(request, error)
                             return render(request, self.template_name, {
                                 'object': obj,
                                 'form': form,
@@ -274,85 +401,84 @@ class ImpactDeleteView(generic.ObjectDeleteView):
     queryset = Impact.objects.all()
 
 
-class ImpactBulkEditView(generic.BulkEditView):
-    queryset = get_ip_address_queryset()
+class ImpactBulkEditView(InstrumentedViewMixin, generic.BulkEditView):
+    queryset = IPAddress.objects.all()
 
     form = ImpactBulkEditForm
     table = ImpactTable
     filterset = ImpactFilterSet
 
-    def _update_objects(self, form, request):
+    @staticmethod
+    def get_changes(form, request):
+        """
+        Return the model field and custom field values to apply to every selected Impact.
+        """
         custom_fields = getattr(form, 'custom_fields', {})
-        standard_fields = [
-            field for field in form.fields if field not in list(custom_fields) + ['pk']
-        ]
         nullified_fields = request.POST.getlist('_nullify')
-        updated_objects = []
-        model_fields = {}
-        m2m_fields = {}
+        changes = {}
+        custom_field_data = {}
 
-        # Build list of model fields and m2m fields for later iteration
-        for name in standard_fields:
+        for name in form.fields:
+            if name in custom_fields or name == 'pk':
+                continue
             try:
                 model_field = Impact._meta.get_field(name)
-                if isinstance(model_field, (ManyToManyField, ManyToManyRel)):
-                    m2m_fields[name] = model_field
-                elif isinstance(model_field, GenericRel):
-                    continue
-                else:
-                    model_fields[name] = model_field
             except FieldDoesNotExist:
-                model_fields[name] = None
-
-        for obj in self.queryset.filter(pk__in=form.cleaned_data['pk']):
-            # Get or create the Impact object for each IP address
-            impact, created = Impact.objects.get_or_create(ip_address=obj, vrf=obj.vrf)
-
-            # Take a snapshot of change-logged models
-            if hasattr(impact, 'snapshot'):
-                impact.snapshot()
-
-            # Update standard fields
-            for name, model_field in model_fields.items():
-                if name in form.nullable_fields and name in nullified_fields:
-                    setattr(impact, name, None if model_field.null else '')
-                elif name in form.changed_data:
-                    setattr(impact, name, form.cleaned_data[name])
-
-            # Update custom fields
-            for name, customfield in custom_fields.items():
-                assert name.startswith('cf_')
-                cf_name = name[3:]
-                if name in form.nullable_fields and name in nullified_fields:
-                    impact.custom_field_data[cf_name] = None
-                elif name in form.changed_data:
-                    impact.custom_field_data[cf_name] = customfield.serialize(form.cleaned_data[name])
-
-            impact.full_clean()
-            impact.save()
-            updated_objects.append(impact)
-
-            # Handle M2M fields after save
-            for name, m2m_field in m2m_fields.items():
-                if name in form.nullable_fields and name in nullified_fields:
-                    getattr(impact, name).clear()
-                elif form.cleaned_data[name]:
-                    getattr(impact, name).set(form.cleaned_data[name])
-
-            # Add/remove tags
-            if form.cleaned_data.get('add_tags', None):
-                impact.tags.add(*form.cleaned_data['add_tags'])
-            if form.cleaned_data.get('remove_tags', None):
-                impact.tags.remove(*form.cleaned_data['remove_tags'])
-
-        return updated_objects
+                continue
+            if isinstance(model_field, (ManyToManyField, ManyToManyRel, GenericRel)):
+                continue
+            if name in form.nullable_fields and name in nullified_fields:
+                changes[name] = None if model_field.null else ''
+            elif name in form.changed_data:
+                changes[name] = form.cleaned_data[name]
+
+        for name, customfield in custom_fields.items():
+            assert name.startswith('cf_')
+            cf_name = name[3:]
+            if name in form.nullable_fields and name in nullified_fields:
+                custom_field_data[cf_name] = None
+            elif name in form.changed_data:
+                custom_field_data[cf_name] = customfield.serialize(form.cleaned_data[name])
+
+        return changes, custom_field_data
+
+    def enqueue_job(self, form, request, ip_address_ids):
+        changes, custom_field_data = self.get_changes(form, request)
+        return Job.enqueue(
+            bulk_edit_impacts_job,
+            instance=ObjectType.objects.get_for_model(Impact),
+            name=BULK_EDIT_JOB_NAME.format(count=len(ip_address_ids)),
+            user=request.user,
+            ip_address_ids=ip_address_ids,
+            changes=changes,
+            custom_field_data=custom_field_data,
+            add_tag_ids=[tag.pk for tag in form.cleaned_data.get('add_tags') or []],
+            remove_tag_ids=[tag.pk for tag in form.cleaned_data.get('remove_tags') or []],
+            chunk_size=get_plugin_config('gestion_impacts', 'bulk_edit_job_chunk_size'),
+            request_id=getattr(request, 'id', None),
+        )
+
+    def _update_objects(self, form, request):
+        changes, custom_field_data = self.get_changes(form, request)
+        queryset = get_ip_address_queryset(self.queryset, fields=())
+        created, updated = bulk_edit_impacts(
+            queryset.filter(pk__in=form.cleaned_data['pk']),
+            changes,
+            custom_field_data,
+            add_tags=form.cleaned_data.get('add_tags'),
+            remove_tags=form.cleaned_data.get('remove_tags'),
+            user=request.user,
+            request_id=getattr(request, 'id', None),
+        )
+        return created + updated
 
     def post(self, request, **kwargs):
         logger = logging.getLogger('netbox.views.BulkEditView')
         model = IPAddress
+        queryset = get_ip_address_queryset(self.queryset)
 
         if request.POST.get('_all') and self.filterset is not None:
-            pk_list = self.filterset(request.GET, self.queryset.values_list('pk', flat=True), request=request).qs
+            pk_list = self.filterset(request.GET, queryset.values_list('pk', flat=True), request=request).qs
         else:
             pk_list = request.POST.getlist('pk')
 
@@ -365,6 +491,14 @@ class ImpactBulkEditView(generic.BulkEditView):
             if form.is_valid():
                 logger.debug("Form validation was successful")
 
+                # Large edits are handed over to a background job
+                selected = get_ip_address_queryset(self.queryset, fields=()).filter(pk__in=form.cleaned_data['pk'])
+                if selected.count() > get_plugin_config('gestion_impacts', 'bulk_edit_job_threshold'):
+                    ip_address_ids = list(selected.values_list('pk', flat=True))
+                    job = self.enqueue_job(form, request, ip_address_ids)
+                    messages.info(request, f'Bulk edit of {len(ip_address_ids)} IP addresses queued')
+                    return redirect('plugins:gestion_impacts:impact_job', pk=job.pk)
+
                 try:
                     with transaction.atomic():
                         updated_objects = self._update_objects(form, request)
@@ -373,6 +507,7 @@ class ImpactBulkEditView(generic.BulkEditView):
                         if object_count != len(updated_objects):
                             raise PermissionsViolation
 
+                    self.metrics.rows = len(updated_objects)
                     if updated_objects:
                         msg = f'Updated {len(updated_objects)} Impacts'
                         logger.info(msg)
@@ -396,7 +531,7 @@ class ImpactBulkEditView(generic.BulkEditView):
             form = self.form(initial=initial_data)
             restrict_form_fields(form, request.user)
 
-        table = self.table(self.queryset.filter(pk__in=pk_list), orderable=False)
+        table = self.table(queryset.filter(pk__in=pk_list), orderable=False)
         if not table.rows:
             messages.warning(request, f"No {model._meta.verbose_name_plural} were selected.")
             return redirect(self.get_return_url(request))
@@ -414,6 +549,121 @@ class ImpactBulkEditView(generic.BulkEditView):
         })
 
 
+class ImpactImportView(ContentTypePermissionRequiredMixin, View):
+    template_name = 'gestion_impacts/impact_import.html'
+    additional_permissions = ['gestion_impacts.change_impact']
+
+    def get_required_permission(self):
+        return 'gestion_impacts.add_impact'
+
+    def get(self, request):
+        return render(request, self.template_name, {
+            'form': ImpactBulkImportForm(),
+            'return_url': reverse('plugins:gestion_impacts:impact_list'),
+        })
+
+    def post(self, request):
+        logger = logging.getLogger('gestion_impacts.views.ImpactImportView')
+        form = ImpactBulkImportForm(request.POST, request.FILES)
+        result = None
+
+        if form.is_valid():
+            result = import_impacts(
+                form.cleaned_data['csv_file'].file,
+                delimiter=form.cleaned_data['delimiter'],
+                chunk_size=get_plugin_config('gestion_impacts', 'import_chunk_size'),
+                user=request.user,
+                request_id=getattr(request, 'id', None),
+                ip_addresses=IPAddress.objects.restrict(request.user, 'view'),
+                impacts=Impact.objects.restrict(request.user, 'change'),
+            )
+            msg = f'Imported {result.rows - result.error_count} of {result.rows} rows ' \
+                  f'({result.created} created, {result.updated} updated)'
+            logger.info(msg)
+            if result.error_count:
+                messages.warning(request, f'{msg}, {result.error_count} errors')
+            else:
+                messages.success(request, msg)
+
+        return render(request, self.template_name, {
+            'form': form,
+            'result': result,
+            'return_url': reverse('plugins:gestion_impacts:impact_list'),
+        })
+
+
+class ImpactBlastRadiusView(ContentTypePermissionRequiredMixin, View):
+    template_name = 'gestion_impacts/blast_radius.html'
+
+    def get_required_permission(self):
+        return 'gestion_impacts.view_impact'
+
+    def get(self, request):
+        form = BlastRadiusForm(request.GET or None)
+        report = None
+        if form.is_valid() and any((scope := form.get_scope()).values()):
+            report = get_blast_radius(scope, IPAddress.objects.restrict(request.user, 'view'))
+
+        return render(request, self.template_name, {
+            'form': form,
+            'report': report,
+        })
+
+
+class ImpactCoverageView(ContentTypePermissionRequiredMixin, View):
+    template_name = 'gestion_impacts/coverage.html'
+
+    def get_required_permission(self):
+        return 'gestion_impacts.view_impact'
+
+    def get(self, request):
+        return render(request, self.template_name, {
+            'coverage': get_coverage(),
+            'refresh_scheduled': get_coverage_jobs().exists(),
+        })
+
+
+class ImpactSlowQueriesView(UserPassesTestMixin, View):
+    template_name = 'gestion_impacts/slow_queries.html'
+
+    def test_func(self):
+        return self.request.user.is_staff
+
+    def get(self, request):
+        return render(request, self.template_name, {
+            'entries': get_slow_requests(),
+            'threshold': get_plugin_config('gestion_impacts', 'slow_query_threshold'),
+        })
+
+    def post(self, request):
+        clear_slow_requests()
+        messages.success(request, "Cleared the slow queries")
+        return redirect('plugins:gestion_impacts:impact_slow_queries')
+
+
+class ImpactJobView(ContentTypePermissionRequiredMixin, View):
+    """
+    Progress of a bulk edit job, shown to the user who submitted it and to the users allowed to view the job.
+    """
+    template_name = 'gestion_impacts/impact_job.html'
+
+    def get_required_permission(self):
+        return 'gestion_impacts.change_impact'
+
+    def get(self, request, pk):
+        jobs = get_bulk_edit_jobs().filter(
+            Q(user=request.user) | Q(pk__in=Job.objects.restrict(request.user, 'view').values('pk'))
+        )
+        job = get_object_or_404(jobs, pk=pk)
+        data = job.data or {}
+        total = data.get('total') or 0
+        return render(request, self.template_name, {
+            'object': job,
+            'progress': int(100 * data.get('processed', 0) / total) if total else 0,
+            'running': not job.completed,
+        })
+
+
 class ImpactBulkDeleteView(generic.BulkDeleteView):
     queryset = Impact.objects.all()
     table = ImpactTable